@@ -1,13 +1,17 @@
 from qfluentwidgets import qconfig
 from PyQt6.QtWidgets import QApplication
-import sys, os
-from src.gui.main_window import MainWindow
+import sys, os, multiprocessing
 from src.common import appConfig
 
 # 设置环境变量以禁用沙箱
 os.environ["QTWEBENGINE_DISABLE_SANDBOX"] = "1"
 
 if __name__ == "__main__":
+    # 打包后的程序需要支持子进程解析日志
+    multiprocessing.freeze_support()
+    # 主窗口只在主进程中导入,避免解析日志的子进程加载界面模块
+    from src.gui.main_window import MainWindow
+
     # 加载配置
     qconfig.load("config/config.json", appConfig)
     # 在app创建前设置缩放比例
@@ -6,6 +6,7 @@ from qfluentwidgets import (
     ConfigItem,
     OptionsConfigItem,
     OptionsValidator,
+    BoolValidator,
     ConfigValidator,
     ConfigSerializer,
     FolderValidator,
@@ -80,6 +81,45 @@ class Config(QConfig):
     )
     # 参数配置文件
     fieldsConfig = ConfigItem("Software", "FieldsConfig", "", restart=True)
+    # 按需加载,打开日志时只建立属性索引,勾选属性时再加载数据
+    lazyLoad = ConfigItem("Software", "LazyLoad", False, BoolValidator())
+    # 解析结果缓存,打开文件时需要计算整个文件的哈希并写入一份副本,默认关闭
+    cacheEnabled = ConfigItem("Cache", "Enabled", False, BoolValidator())
+    cacheFolder = ConfigItem(
+        "Cache", "Folder", QDir.currentPath() + "/cache", FolderValidator()
+    )
+    # 缓存大小上限(MB)
+    cacheMaxSize = ConfigItem(
+        "Cache", "MaxSize", "2048", ThresholdValidator(2048), restart=False
+    )
+    # 导出时的进程数,0表示与CPU核数相同
+    exportWorkers = ConfigItem(
+        "Software", "ExportWorkers", "0", ThresholdValidator(0), restart=False
+    )
+    # 导出格式,npz和hdf5将所有topic写入一个文件,其余格式每个topic一个文件
+    exportFormat = OptionsConfigItem(
+        "Software",
+        "ExportFormat",
+        "csv",
+        OptionsValidator(["csv", "npz", "hdf5", "parquet", "feather"]),
+        restart=False,
+    )
+    # 导出二进制格式时的压缩方式
+    exportCompression = OptionsConfigItem(
+        "Software",
+        "ExportCompression",
+        "fast",
+        OptionsValidator(["none", "fast", "small"]),
+        restart=False,
+    )
+    # 不同topic对齐到同一时间时的取值方式,用于对齐导出和指示线读数
+    alignMethod = OptionsConfigItem(
+        "Software",
+        "AlignMethod",
+        "nearest",
+        OptionsValidator(["nearest", "previous", "linear"]),
+        restart=False,
+    )
     # 图表类型
     chartType = OptionsConfigItem(
         "Software",
@@ -88,14 +128,42 @@ class Config(QConfig):
         OptionsValidator(["line", "scatter"]),
         restart=False,
     )
+    # 图表绘制方式,echart或使用QPainter直接绘制
+    chartRenderer = OptionsConfigItem(
+        "Software",
+        "ChartRenderer",
+        "echarts",
+        OptionsValidator(["echarts", "native"]),
+        restart=True,
+    )
     # 图表采样
     chartSampling = OptionsConfigItem(
         "Software",
         "ChartSampling",
         "lttb",
-        OptionsValidator(["lttb", "average", "min", "max", "none"]),
+        OptionsValidator(["lttb", "m4", "average", "min", "max", "none"]),
+        restart=False,
+    )
+    # 绘图预处理的线程数,0表示与CPU核数相同
+    chartWorkers = ConfigItem(
+        "Software", "ChartWorkers", "0", ThresholdValidator(0), restart=False
+    )
+    # 按绘图区域宽度自动计算采样点数,关闭时使用下面的固定点数
+    adaptivePointNum = ConfigItem(
+        "Software", "AdaptivePointNum", True, BoolValidator(), restart=False
+    )
+    # 自动计算时所有series的总点数上限
+    chartPointBudget = ConfigItem(
+        "Software",
+        "ChartPointBudget",
+        "200000",
+        ThresholdValidator(200000),
         restart=False,
     )
+    # 传输给图表的属性值使用单精度,时间戳保持双精度
+    chartFloat32 = ConfigItem(
+        "Software", "ChartFloat32", False, BoolValidator(), restart=False
+    )
     # 图表采样阈值
     insidePointNum = ConfigItem(
         "Software",
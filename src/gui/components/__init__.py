@@ -1,4 +1,8 @@
+from .export_dialog import ExportDialog
+from .field_tree_model import FieldTreeModel, FieldFilterProxyModel
 from .info_dialog import LogInfoDialog
 from .input_setting_card import InputSettingCard
 from .label_input_card import LabelInputCard
-from .label_text_card import LabelTextCard
\ No newline at end of file
+from .label_text_card import LabelTextCard
+from .log_table_model import LogTableModel
+from .native_chart import NativeChartWidget
@@ -0,0 +1,231 @@
+from qfluentwidgets import (
+    FluentStyleSheet,
+    MaskDialogBase,
+    TitleLabel,
+    BodyLabel,
+    TreeWidget,
+    LineEdit,
+    SpinBox,
+    PushButton,
+    PrimaryPushButton,
+    ComboBox,
+)
+from PyQt6.QtCore import Qt, QRegularExpression
+from PyQt6.QtGui import QColor, QRegularExpressionValidator
+from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QTreeWidgetItem
+from src.utils import TopicStore
+
+
+class ExportDialog(MaskDialogBase):
+    """
+    描述:
+        导出设置对话框,选择导出的属性、时间范围、抽取间隔和时间对齐方式
+    """
+
+    # 时间网格的来源
+    ALIGN_GRIDS = ["不对齐", "固定频率", "参考topic"]
+
+    def __init__(
+        self,
+        fields: TopicStore,
+        checkedFields: dict = None,
+        timeRange=None,
+        alignMethod: str = "nearest",
+        parent=None,
+    ):
+        """
+        参数:
+            fields (TopicStore): topic数据或索引
+            checkedFields (dict, optional): {topic名称: 属性名列表},默认勾选的属性,
+                为空时勾选全部属性
+            timeRange (tuple, optional): 默认的(起始,终止)时间戳,为None时导出全部时间
+            alignMethod (str, optional): 默认的对齐方式
+            parent (QWidget, optional): 父窗口
+        """
+        super().__init__(parent=parent)
+        # 应用样式
+        FluentStyleSheet.DIALOG.apply(self.widget)
+        self.setShadowEffect(60, (0, 10), QColor(0, 0, 0, 50))
+        self.setMaskColor(QColor(0, 0, 0, 76))
+        self.setContentsMargins(40, 40, 40, 40)
+        # 初始化UI
+        self.initUI(self.widget)
+        self.widget.setLayout(self.dialogLayout)
+        self.displayFields(fields, checkedFields or {})
+        self.referenceComboBox.addItems(list(fields))
+        self.methodComboBox.setCurrentText(alignMethod)
+        self.onGridChanged(0)
+        if timeRange is not None:
+            # 时间戳单位为微秒,输入框单位为秒
+            self.startEdit.setText(f"{timeRange[0] / 1e6:.6f}")
+            self.endEdit.setText(f"{timeRange[1] / 1e6:.6f}")
+
+    def initUI(self, dialog):
+        self.dialogLayout = QVBoxLayout(dialog)
+
+        titleLayout = QHBoxLayout()
+        titleLayout.setContentsMargins(5, 5, 5, 5)
+        self.title = TitleLabel("导出数据")
+        titleLayout.addStretch()
+        titleLayout.addWidget(self.title)
+        titleLayout.addStretch()
+        # 属性选择
+        self.fieldTree = TreeWidget()
+        self.fieldTree.setHeaderHidden(True)
+        self.fieldTree.setMinimumSize(420, 320)
+        # 时间范围,为空表示不限制
+        validator = QRegularExpressionValidator(
+            QRegularExpression(r"^\d+(\.\d*)?$"), self
+        )
+        self.startEdit = LineEdit()
+        self.startEdit.setPlaceholderText("开始")
+        self.startEdit.setValidator(validator)
+        self.startEdit.setClearButtonEnabled(True)
+        self.endEdit = LineEdit()
+        self.endEdit.setPlaceholderText("结束")
+        self.endEdit.setValidator(validator)
+        self.endEdit.setClearButtonEnabled(True)
+        self.fullRangeButton = PushButton("全部时间")
+        self.fullRangeButton.clicked.connect(self.startEdit.clear)
+        self.fullRangeButton.clicked.connect(self.endEdit.clear)
+        timeLayout = QHBoxLayout()
+        timeLayout.addWidget(BodyLabel("时间范围(s)"))
+        timeLayout.addWidget(self.startEdit)
+        timeLayout.addWidget(BodyLabel("-"))
+        timeLayout.addWidget(self.endEdit)
+        timeLayout.addWidget(self.fullRangeButton)
+        # 抽取间隔
+        self.stepSpinBox = SpinBox()
+        self.stepSpinBox.setRange(1, 1000000)
+        self.stepSpinBox.setValue(1)
+        stepLayout = QHBoxLayout()
+        stepLayout.addWidget(BodyLabel("抽取间隔(每隔n个点保留一个)"))
+        stepLayout.addStretch()
+        stepLayout.addWidget(self.stepSpinBox)
+        # 对齐到同一时间网格后导出为一张宽表
+        self.gridComboBox = ComboBox()
+        self.gridComboBox.addItems(self.ALIGN_GRIDS)
+        self.gridComboBox.currentIndexChanged.connect(self.onGridChanged)
+        self.rateEdit = LineEdit()
+        self.rateEdit.setPlaceholderText("频率(Hz)")
+        self.rateEdit.setValidator(validator)
+        self.rateEdit.setText("100")
+        self.referenceComboBox = ComboBox()
+        self.methodComboBox = ComboBox()
+        self.methodComboBox.addItems(["nearest", "previous", "linear"])
+        alignLayout = QHBoxLayout()
+        alignLayout.addWidget(BodyLabel("时间对齐"))
+        alignLayout.addStretch()
+        alignLayout.addWidget(self.gridComboBox)
+        alignLayout.addWidget(self.rateEdit)
+        alignLayout.addWidget(self.referenceComboBox)
+        alignLayout.addWidget(self.methodComboBox)
+        # 按钮
+        self.cancelButton = PushButton("取消")
+        self.cancelButton.clicked.connect(self.reject)
+        self.exportButton = PrimaryPushButton("导出")
+        self.exportButton.clicked.connect(self.accept)
+        buttonLayout = QHBoxLayout()
+        buttonLayout.addStretch()
+        buttonLayout.addWidget(self.cancelButton)
+        buttonLayout.addWidget(self.exportButton)
+
+        # 组装UI
+        self.dialogLayout.setContentsMargins(36, 24, 36, 24)
+        self.dialogLayout.addLayout(titleLayout)
+        self.dialogLayout.addSpacing(12)
+        self.dialogLayout.addWidget(self.fieldTree)
+        self.dialogLayout.addSpacing(8)
+        self.dialogLayout.addLayout(timeLayout)
+        self.dialogLayout.addLayout(stepLayout)
+        self.dialogLayout.addLayout(alignLayout)
+        self.dialogLayout.addSpacing(12)
+        self.dialogLayout.addLayout(buttonLayout)
+
+    def onGridChanged(self, index: int):
+        self.rateEdit.setVisible(index == 1)
+        self.referenceComboBox.setVisible(index == 2)
+        self.methodComboBox.setVisible(index != 0)
+
+    def displayFields(self, fields: TopicStore, checkedFields: dict):
+        """
+        描述:
+            显示可导出的属性,topic的勾选状态由子项自动决定
+
+        参数:
+            fields (TopicStore): topic数据或索引
+            checkedFields (dict): 默认勾选的属性
+        """
+        for topField, topic in fields.items():
+            topItem = QTreeWidgetItem([topField])
+            topItem.setFlags(
+                topItem.flags()
+                | Qt.ItemFlag.ItemIsUserCheckable
+                | Qt.ItemFlag.ItemIsAutoTristate
+            )
+            for innerField in topic.columns:
+                innerItem = QTreeWidgetItem([innerField])
+                innerItem.setFlags(innerItem.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+                checked = (
+                    len(checkedFields) == 0
+                    or innerField in checkedFields.get(topField, ())
+                )
+                innerItem.setCheckState(
+                    0, Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
+                )
+                topItem.addChild(innerItem)
+            self.fieldTree.addTopLevelItem(topItem)
+
+    def getSelection(self) -> dict:
+        """
+        描述:
+            获取勾选的属性
+
+        返回值:
+            dict: {topic名称: 属性名列表},只包含有勾选属性的topic
+        """
+        selection = {}
+        for i in range(self.fieldTree.topLevelItemCount()):
+            topItem = self.fieldTree.topLevelItem(i)
+            names = [
+                topItem.child(j).text(0)
+                for j in range(topItem.childCount())
+                if topItem.child(j).checkState(0) == Qt.CheckState.Checked
+            ]
+            if len(names) > 0:
+                selection[topItem.text(0)] = names
+        return selection
+
+    def getTimeRange(self) -> tuple:
+        """
+        描述:
+            获取导出的时间范围
+
+        返回值:
+            tuple: (起始,终止)时间戳,未填写的一端为None
+        """
+        return tuple(
+            float(edit.text()) * 1e6 if edit.text() else None
+            for edit in (self.startEdit, self.endEdit)
+        )
+
+    def getStep(self) -> int:
+        return self.stepSpinBox.value()
+
+    def getAlignment(self):
+        """
+        描述:
+            获取时间对齐设置
+
+        返回值:
+            dict: {"method": 对齐方式, "rate": 频率, "reference": 参考topic},
+            rate和reference只有一个不为None,不对齐时返回None
+        """
+        index = self.gridComboBox.currentIndex()
+        if index == 0 or (index == 1 and not float(self.rateEdit.text() or 0)):
+            return None
+        return {
+            "method": self.methodComboBox.currentText(),
+            "rate": float(self.rateEdit.text()) if index == 1 else None,
+            "reference": self.referenceComboBox.currentText() if index == 2 else None,
+        }
@@ -0,0 +1,277 @@
+from PyQt6.QtCore import (
+    Qt,
+    QAbstractItemModel,
+    QModelIndex,
+    QSortFilterProxyModel,
+    pyqtSignal,
+)
+import numpy as np
+import re
+from src.utils import TopicStore
+
+
+class FieldTreeModel(QAbstractItemModel):
+    """
+    描述:
+        topic和属性两层的勾选树模型。所有属性按topic顺序平铺保存,
+        勾选和可见状态为布尔数组,topic的勾选状态由每个topic可见属性中
+        已勾选的数量决定,勾选时增量更新数量,不再遍历所有子项。
+        搜索在预先计算的小写"topic.属性名"索引上进行
+    """
+
+    # 用户修改勾选状态的信号
+    checkStateChanged = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFields({})
+
+    def setFields(self, fields: TopicStore):
+        """
+        描述:
+            根据topic重建模型,所有属性均不勾选
+
+        参数:
+            fields (TopicStore): topic数据或索引
+        """
+        self.beginResetModel()
+        self.topics = list(fields)
+        self.names = []
+        starts = [0]
+        for topic in fields.values():
+            self.names += list(topic.columns)
+            starts.append(len(self.names))
+        # 第i个topic的属性为names[starts[i]:starts[i + 1]]
+        self.starts = np.array(starts, dtype=np.int64)
+        self.topicOf = np.repeat(np.arange(len(self.topics)), np.diff(self.starts))
+        self.searchKeys = np.array(
+            [
+                f"{self.topics[t]}.{name}".lower()
+                for t, name in zip(self.topicOf, self.names)
+            ],
+            dtype=str,
+        )
+        self.checked = np.zeros(len(self.names), dtype=bool)
+        self.visible = np.ones(len(self.names), dtype=bool)
+        self.updateCounts()
+        self.endResetModel()
+
+    def updateCounts(self):
+        """
+        描述:
+            重新统计每个topic可见属性的数量和其中已勾选的数量
+        """
+        topicCount = len(self.topics)
+        self.visibleCounts = np.bincount(
+            self.topicOf, weights=self.visible, minlength=topicCount
+        ).astype(np.int64)
+        self.checkedCounts = np.bincount(
+            self.topicOf, weights=self.visible & self.checked, minlength=topicCount
+        ).astype(np.int64)
+
+    def index(self, row: int, column: int, parent=QModelIndex()) -> QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        # internalId为0表示topic,否则为所属topic的序号加一
+        if not parent.isValid():
+            return self.createIndex(row, column, 0)
+        return self.createIndex(row, column, parent.row() + 1)
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, 0)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self.topics)
+        if parent.internalId() == 0:
+            return int(self.starts[parent.row() + 1] - self.starts[parent.row()])
+        return 0
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 1
+
+    def fieldPosition(self, index: QModelIndex) -> int:
+        """
+        描述:
+            获取属性在平铺数组中的位置,topic返回-1
+        """
+        if index.internalId() == 0:
+            return -1
+        return int(self.starts[index.internalId() - 1]) + index.row()
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        position = self.fieldPosition(index)
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.topics[index.row()] if position < 0 else self.names[position]
+        if role == Qt.ItemDataRole.CheckStateRole:
+            if position >= 0:
+                return (
+                    Qt.CheckState.Checked
+                    if self.checked[position]
+                    else Qt.CheckState.Unchecked
+                )
+            return self.topicCheckState(index.row())
+        return None
+
+    def topicCheckState(self, topic: int) -> Qt.CheckState:
+        """
+        描述:
+            topic的勾选状态,由可见属性的勾选数量决定,
+            没有可见属性时按全部属性计算
+        """
+        visible = self.visibleCounts[topic]
+        checked = self.checkedCounts[topic]
+        if visible == 0:
+            start, end = self.starts[topic], self.starts[topic + 1]
+            visible, checked = end - start, self.checked[start:end].sum()
+        if visible > 0 and checked == visible:
+            return Qt.CheckState.Checked
+        if checked == 0:
+            return Qt.CheckState.Unchecked
+        return Qt.CheckState.PartiallyChecked
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return (
+            Qt.ItemFlag.ItemIsEnabled
+            | Qt.ItemFlag.ItemIsSelectable
+            | Qt.ItemFlag.ItemIsUserCheckable
+        )
+
+    def setData(self, index: QModelIndex, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+        checked = Qt.CheckState(value) == Qt.CheckState.Checked
+        position = self.fieldPosition(index)
+        if position >= 0:
+            self.setChecked(np.array([position]), checked)
+        else:
+            # 勾选topic时只改变可见的属性
+            start, end = self.starts[index.row()], self.starts[index.row() + 1]
+            positions = np.arange(start, end)
+            if self.visibleCounts[index.row()] > 0:
+                positions = positions[self.visible[start:end]]
+            self.setChecked(positions, checked)
+        self.checkStateChanged.emit()
+        return True
+
+    def setChecked(self, positions: np.ndarray, checked: bool):
+        """
+        描述:
+            修改属性的勾选状态,增量更新所属topic的勾选数量
+
+        参数:
+            positions (np.ndarray): 属性在平铺数组中的位置
+            checked (bool): 是否勾选
+        """
+        changed = positions[self.checked[positions] != checked]
+        if len(changed) == 0:
+            return
+        self.checked[changed] = checked
+        delta = np.bincount(
+            self.topicOf[changed],
+            weights=self.visible[changed],
+            minlength=len(self.topics),
+        ).astype(np.int64)
+        self.checkedCounts += delta if checked else -delta
+        role = [Qt.ItemDataRole.CheckStateRole]
+        for topic in np.unique(self.topicOf[changed]):
+            topicIndex = self.createIndex(int(topic), 0, 0)
+            rows = changed[self.topicOf[changed] == topic] - self.starts[topic]
+            self.dataChanged.emit(
+                self.index(int(rows.min()), 0, topicIndex),
+                self.index(int(rows.max()), 0, topicIndex),
+                role,
+            )
+            self.dataChanged.emit(topicIndex, topicIndex, role)
+
+    def setCheckedFields(self, checkedFields: dict):
+        """
+        描述:
+            勾选指定的属性,不发送checkStateChanged信号
+
+        参数:
+            checkedFields (dict): {topic名称: 属性名的可迭代对象}
+        """
+        positions = []
+        for t, topField in enumerate(self.topics):
+            if topField not in checkedFields:
+                continue
+            start = self.starts[t]
+            names = self.names[start : self.starts[t + 1]]
+            wanted = checkedFields[topField]
+            positions += [start + i for i, name in enumerate(names) if name in wanted]
+        self.setChecked(np.array(positions, dtype=np.int64), True)
+
+    def getCheckedFields(self) -> list:
+        """
+        描述:
+            获取已勾选的属性,按树中的顺序排列
+
+        返回值:
+            list: (topic名称,属性名)列表
+        """
+        return [
+            (self.topics[self.topicOf[i]], self.names[i])
+            for i in np.flatnonzero(self.checked)
+        ]
+
+    def getField(self, index: QModelIndex) -> tuple:
+        """
+        描述:
+            获取索引对应的(topic名称,属性名),topic的属性名为None
+        """
+        position = self.fieldPosition(index)
+        if position < 0:
+            return self.topics[index.row()], None
+        return self.topics[self.topicOf[position]], self.names[position]
+
+    def setFilterText(self, text: str):
+        """
+        描述:
+            按"topic.属性名"过滤属性,忽略大小写。优先按子串匹配,
+            没有任何子串匹配时按顺序包含所有字符的模糊匹配
+
+        参数:
+            text (str): 搜索文本
+        """
+        text = text.strip().lower()
+        if len(text) == 0:
+            self.visible[:] = True
+        else:
+            self.visible = np.char.find(self.searchKeys, text) >= 0
+            if not self.visible.any():
+                pattern = re.compile(".*?".join(map(re.escape, text)))
+                self.visible = np.array(
+                    [pattern.search(key) is not None for key in self.searchKeys],
+                    dtype=bool,
+                )
+        self.updateCounts()
+        if len(self.topics) > 0:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(len(self.topics) - 1, 0),
+                [Qt.ItemDataRole.CheckStateRole],
+            )
+
+
+class FieldFilterProxyModel(QSortFilterProxyModel):
+    """
+    描述:
+        根据FieldTreeModel中的可见状态过滤属性,没有可见属性的topic同样被过滤
+    """
+
+    def filterAcceptsRow(self, sourceRow: int, sourceParent: QModelIndex) -> bool:
+        model = self.sourceModel()
+        if not sourceParent.isValid():
+            return bool(model.visibleCounts[sourceRow] > 0)
+        return bool(model.visible[model.starts[sourceParent.row()] + sourceRow])
+
+    def setFilterText(self, text: str):
+        self.sourceModel().setFilterText(text)
+        self.invalidateRowsFilter()
@@ -0,0 +1,167 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+import numpy as np
+
+
+class LogTableModel(QAbstractTableModel):
+    """
+    描述:
+        日志消息表格的数据模型,直接引用[时间,等级,消息]列表,
+        表格只在绘制可见行时读取数据,设置数据的代价与消息数量无关。
+        过滤和排序只计算行号数组,不复制消息
+    """
+
+    HEADERS = ["时间", "日志等级", "消息"]
+    # 日志等级按严重程度排列,对应pyulog的log_level_str
+    LEVELS = [
+        "EMERGENCY",
+        "ALERT",
+        "CRITICAL",
+        "ERROR",
+        "WARNING",
+        "NOTICE",
+        "INFO",
+        "DEBUG",
+        "UNKNOWN",
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.messages = []
+        # 显示的行对应的消息序号,为None时按原始顺序显示全部消息
+        self.rows = None
+        # 排序和过滤使用的列,第一次用到时计算
+        self.timestamps = None
+        self.levelRanks = None
+        # 显示的最低严重程度(LEVELS中的序号)和时间范围
+        self.maxLevel = len(self.LEVELS) - 1
+        self.timeRange = None
+        self.sortColumn = -1
+        self.sortOrder = Qt.SortOrder.AscendingOrder
+
+    def setMessages(self, messages: list):
+        """
+        描述:
+            设置日志消息,同时清除过滤和排序条件
+
+        参数:
+            messages (list): get_logged_message的结果
+        """
+        self.beginResetModel()
+        self.messages = messages
+        self.rows = None
+        self.timestamps = None
+        self.levelRanks = None
+        self.maxLevel = len(self.LEVELS) - 1
+        self.timeRange = None
+        self.sortColumn = -1
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.messages) if self.rows is None else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        return self.messages[self.messageIndex(index.row())][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            role == Qt.ItemDataRole.DisplayRole
+            and orientation == Qt.Orientation.Horizontal
+        ):
+            return self.HEADERS[section]
+        return None
+
+    def messageIndex(self, row: int) -> int:
+        return row if self.rows is None else int(self.rows[row])
+
+    def getTimestamp(self, row: int) -> float:
+        """
+        描述:
+            获取某一行消息的时间戳
+
+        参数:
+            row (int): 表格中的行
+
+        返回值:
+            float: 时间戳(微秒)
+        """
+        return float(self.getTimestamps()[self.messageIndex(row)])
+
+    def getTimestamps(self) -> np.ndarray:
+        """
+        描述:
+            将"分:秒:毫秒"格式的时间转换为时间戳,只在第一次用到时计算
+        """
+        if self.timestamps is None:
+            times = []
+            for message in self.messages:
+                minutes, seconds, milliseconds = message[0].split(":")
+                times.append(
+                    int(minutes) * 60000000
+                    + int(seconds) * 1000000
+                    + int(milliseconds) * 1000
+                )
+            self.timestamps = np.array(times, dtype=np.int64)
+        return self.timestamps
+
+    def getLevelRanks(self) -> np.ndarray:
+        if self.levelRanks is None:
+            ranks = {level: i for i, level in enumerate(self.LEVELS)}
+            unknown = len(self.LEVELS) - 1
+            self.levelRanks = np.array(
+                [ranks.get(message[1], unknown) for message in self.messages],
+                dtype=np.int8,
+            )
+        return self.levelRanks
+
+    def setFilter(self, maxLevel: int = None, timeRange=None):
+        """
+        描述:
+            只显示严重程度不低于maxLevel且在时间范围内的消息
+
+        参数:
+            maxLevel (int, optional): LEVELS中的序号,None表示显示全部等级
+            timeRange (tuple, optional): (起始,终止)时间戳,None表示不限制时间
+        """
+        self.maxLevel = len(self.LEVELS) - 1 if maxLevel is None else maxLevel
+        self.timeRange = timeRange
+        self.updateRows()
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        self.sortColumn = column
+        self.sortOrder = order
+        self.updateRows()
+
+    def updateRows(self):
+        """
+        描述:
+            根据过滤和排序条件重新计算显示的行
+        """
+        self.beginResetModel()
+        rows = np.arange(len(self.messages))
+        if self.maxLevel < len(self.LEVELS) - 1:
+            rows = rows[self.getLevelRanks()[rows] <= self.maxLevel]
+        if self.timeRange is not None:
+            times = self.getTimestamps()[rows]
+            rows = rows[(times >= self.timeRange[0]) & (times <= self.timeRange[1])]
+        if self.sortColumn >= 0:
+            if self.sortColumn == 0:
+                keys = self.getTimestamps()[rows]
+            elif self.sortColumn == 1:
+                keys = self.getLevelRanks()[rows]
+            else:
+                keys = np.array([self.messages[i][2] for i in rows])
+            if self.sortOrder == Qt.SortOrder.DescendingOrder:
+                # 倒序时相同的值仍保持原始顺序
+                rows = rows[::-1][np.argsort(keys[::-1], kind="stable")][::-1]
+            else:
+                rows = rows[np.argsort(keys, kind="stable")]
+        unfiltered = self.sortColumn < 0 and len(rows) == len(self.messages)
+        self.rows = None if unfiltered else rows
+        self.endResetModel()
@@ -0,0 +1,482 @@
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QPointF, QRectF, pyqtSignal
+from PyQt6.QtGui import QPainter, QPen, QColor, QPolygonF, QFontMetrics
+from src.utils import align_column, searchTime, ulog_timestamp_to_time
+import numpy as np
+import math
+
+
+def toPolygon(points: np.ndarray) -> QPolygonF:
+    """
+    描述:
+        将[[x,y],[x,y]...]数组直接写入QPolygonF的内存,避免逐点创建QPointF
+
+    参数:
+        points (np.ndarray): 像素坐标数组
+
+    返回值:
+        QPolygonF: 折线
+    """
+    polygon = QPolygonF()
+    polygon.fill(QPointF(), len(points))
+    if len(points) > 0:
+        buffer = polygon.data()
+        buffer.setsize(points.size * 8)
+        np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)[:] = points
+    return polygon
+
+
+def finiteSegments(points: np.ndarray) -> list:
+    """
+    描述:
+        在NaN处断开折线,与echart不连接空值的效果相同
+
+    参数:
+        points (np.ndarray): 像素坐标数组,可以包含NaN
+
+    返回值:
+        list: 每段连续有效点的像素坐标数组
+    """
+    finite = np.isfinite(points).all(axis=1)
+    # 有效点连续段的起止位置交替出现
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], finite, [0])).astype(np.int8)))
+    return [points[start:end] for start, end in zip(edges[0::2], edges[1::2])]
+
+
+def niceTicks(start: float, end: float, count: int) -> np.ndarray:
+    """
+    描述:
+        计算坐标轴刻度,刻度间隔为1、2、5乘以10的整数次幂
+
+    参数:
+        start (float): 坐标轴起始值
+        end (float): 坐标轴终止值
+        count (int): 期望的刻度数量
+
+    返回值:
+        np.ndarray: 刻度值
+    """
+    span = end - start
+    if not math.isfinite(span) or span <= 0:
+        return np.array([start])
+    rawStep = span / max(count, 1)
+    magnitude = 10 ** math.floor(math.log10(rawStep))
+    step = next(
+        (factor * magnitude for factor in (1, 2, 5) if factor * magnitude >= rawStep),
+        10 * magnitude,
+    )
+    return np.arange(math.ceil(start / step), math.floor(end / step) + 1) * step
+
+
+class NativeChartWidget(QWidget):
+    """
+    描述:
+        使用QPainter直接绘制self.fields中numpy数组的图表,作为echart的替代。
+        每次绘制只取可见范围内的数据,并通过LOD金字塔缩减到与像素宽度同一数量级,
+        缩放和平移不需要任何序列化。
+        滚轮缩放x轴和y轴,拖动平移,双击恢复,点击图例显示或隐藏series
+    """
+
+    # echart默认的调色板
+    PALETTE = [
+        "#5470c6",
+        "#91cc75",
+        "#fac858",
+        "#ee6666",
+        "#73c0de",
+        "#3ba272",
+        "#fc8452",
+        "#9a60b4",
+        "#ea7ccc",
+    ]
+    # 绘图区域的边距(左,上,右,下)
+    MARGINS = (70, 36, 24, 28)
+    # 每个像素宽度保留的点数
+    POINTS_PER_PIXEL = 2
+    # 缩放、平移或恢复后绘图区域改变的信号
+    viewportChanged = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        # (id,名称,时间戳,属性值,缩放,偏移,LOD金字塔,颜色)
+        self.series = []
+        # 被图例隐藏的series
+        self.hiddenSeries = set()
+        # 缩放后的绘图区域(xs,xe,ys,ye),为None时显示全部数据
+        self.viewport = None
+        # 全部数据的范围
+        self.dataRange = (0.0, 1.0, 0.0, 1.0)
+        # 属性值的最小值和最大值,按属性值数组缓存
+        self.valueRanges = {}
+        self.markLine = None
+        # 读取鼠标位置属性值时的对齐方式
+        self.alignMethod = "nearest"
+        # 所有可见series的总点数上限,为0时不限制
+        self.pointBudget = 0
+        self.timeType = 0
+        self.chartType = "line"
+        self.isDark = False
+        self.mousePos = None
+        self.dragStart = None
+        self.legendRects = []
+        self.setMouseTracking(True)
+
+    def setSeries(
+        self, checkedSeries: list, timeType: int, chartType: str, reset: bool
+    ):
+        """
+        描述:
+            设置要绘制的属性
+
+        参数:
+            checkedSeries (list): MainInterface.getCheckedSeries的快照
+            timeType (int): x轴的时间格式,同ulog_timestamp_to_time
+            chartType (str): line或scatter
+            reset (bool): 是否恢复为显示全部数据
+        """
+        self.series = []
+        for i, item in enumerate(checkedSeries):
+            topField, innerField, times, values, zoom, offset, lodPyramid = item
+            seriesId = f"{topField}.{innerField}"
+            color = QColor(self.PALETTE[i % len(self.PALETTE)])
+            self.series.append(
+                (seriesId, seriesId, times, values, zoom, offset, lodPyramid, color)
+            )
+        seriesIds = {item[0] for item in self.series}
+        self.hiddenSeries &= seriesIds
+        self.valueRanges = {
+            seriesId: item
+            for seriesId, item in self.valueRanges.items()
+            if seriesId in seriesIds
+        }
+        self.timeType = timeType
+        self.chartType = chartType
+        self.dataRange = self.getDataRange()
+        if reset:
+            self.setViewport(None)
+        self.update()
+
+    def getValueRange(self, seriesId: str, values: np.ndarray) -> tuple:
+        """
+        描述:
+            获取属性值的最小值和最大值,按series缓存,属性值数组改变时重新计算
+
+        返回值:
+            tuple: (最小值,最大值)
+        """
+        cached = self.valueRanges.get(seriesId)
+        if cached is None or cached[0] is not values:
+            finite = values[np.isfinite(values)]
+            if len(finite) == 0:
+                cached = (values, 0.0, 0.0)
+            else:
+                cached = (values, float(finite.min()), float(finite.max()))
+            self.valueRanges[seriesId] = cached
+        return cached[1:]
+
+    def getDataRange(self) -> tuple:
+        """
+        描述:
+            计算全部可见series变换后的数据范围
+
+        返回值:
+            tuple: (xs,xe,ys,ye)
+        """
+        xs, xe, ys, ye = math.inf, -math.inf, math.inf, -math.inf
+        for seriesId, _, times, values, zoom, offset, _, _ in self.series:
+            if seriesId in self.hiddenSeries or len(times) == 0:
+                continue
+            xs, xe = min(xs, float(times[0])), max(xe, float(times[-1]))
+            low, high = self.getValueRange(seriesId, values)
+            low, high = sorted((low * zoom + offset, high * zoom + offset))
+            ys, ye = min(ys, low), max(ye, high)
+        if not math.isfinite(xs):
+            return (0.0, 1.0, 0.0, 1.0)
+        if xe <= xs:
+            xe = xs + 1
+        if ye <= ys:
+            ys, ye = ys - 0.5, ye + 0.5
+        # y轴上下各留出一些空白
+        padding = (ye - ys) * 0.05
+        return (xs, xe, ys - padding, ye + padding)
+
+    def getViewport(self) -> tuple:
+        return self.viewport or self.dataRange
+
+    def setViewport(self, viewport):
+        """
+        描述:
+            设置绘图区域并重绘,区域改变时发送viewportChanged信号
+
+        参数:
+            viewport (tuple): (xs,xe,ys,ye),为None时显示全部数据
+        """
+        changed = viewport != self.viewport
+        self.viewport = viewport
+        self.update()
+        if changed:
+            self.viewportChanged.emit()
+
+    def setMarkLine(self, xValue: float):
+        """
+        描述:
+            添加指示线,与已有指示线位置相同时删除
+
+        参数:
+            xValue (float): 指示线的时间戳
+        """
+        self.markLine = None if self.markLine == xValue else xValue
+        self.update()
+
+    def setDarkTheme(self, isDark: bool):
+        self.isDark = isDark
+        self.update()
+
+    def clear(self):
+        self.series = []
+        self.setViewport(None)
+        self.update()
+
+    def plotRect(self) -> QRectF:
+        left, top, right, bottom = self.MARGINS
+        return QRectF(
+            left,
+            top,
+            max(self.width() - left - right, 1),
+            max(self.height() - top - bottom, 1),
+        )
+
+    def toPixel(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        描述:
+            将数据坐标转换为像素坐标
+
+        参数:
+            x (np.ndarray): 时间戳
+            y (np.ndarray): 变换后的属性值
+
+        返回值:
+            np.ndarray: [[px,py]...]像素坐标
+        """
+        xs, xe, ys, ye = self.getViewport()
+        rect = self.plotRect()
+        px = rect.left() + (x - xs) * (rect.width() / (xe - xs))
+        py = rect.bottom() - (y - ys) * (rect.height() / (ye - ys))
+        return np.stack((px, py), axis=1)
+
+    def toData(self, pos: QPointF) -> tuple:
+        xs, xe, ys, ye = self.getViewport()
+        rect = self.plotRect()
+        x = xs + (pos.x() - rect.left()) / rect.width() * (xe - xs)
+        y = ys + (rect.bottom() - pos.y()) / rect.height() * (ye - ys)
+        return x, y
+
+    def visiblePoints(self, times, values, zoom, offset, lodPyramid) -> np.ndarray:
+        """
+        描述:
+            获取可见范围内的点并转换为像素坐标,两侧各多保留一个点
+
+        返回值:
+            np.ndarray: [[px,py]...]像素坐标,保留NaN用于断开折线
+        """
+        xs, xe, _, _ = self.getViewport()
+        start = max(searchTime(times, xs, "left") - 1, 0)
+        end = min(searchTime(times, xe, "right") + 1, len(times))
+        # 按物理像素计算点数,可见series较多时平分总点数上限
+        nout = int(
+            self.plotRect().width() * self.devicePixelRatioF() * self.POINTS_PER_PIXEL
+        )
+        if self.pointBudget > 0:
+            visibleCount = max(len(self.series) - len(self.hiddenSeries), 1)
+            # 总点数不超过上限,LodPyramid.query至少保留首尾2个点
+            nout = min(nout, self.pointBudget // visibleCount)
+        if lodPyramid is not None:
+            indices = lodPyramid.query(start, end, nout)
+        else:
+            indices = slice(start, end)
+        x = times[indices].astype(np.float64)
+        y = values[indices].astype(np.float64) * zoom + offset
+        return self.toPixel(x, y)
+
+    def paintEvent(self, e):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        textColor = QColor("#eeeeee" if self.isDark else "#6e7079")
+        gridColor = QColor("#484753" if self.isDark else "#e0e6f1")
+        if self.isDark:
+            painter.fillRect(self.rect(), QColor("black"))
+        rect = self.plotRect()
+        xs, xe, ys, ye = self.getViewport()
+        metrics = QFontMetrics(painter.font())
+        # 网格和坐标轴标签
+        painter.setPen(QPen(gridColor, 1))
+        for tick in niceTicks(ys, ye, max(int(rect.height() / 50), 2)):
+            py = self.toPixel(np.array([xs]), np.array([tick]))[0, 1]
+            painter.setPen(QPen(gridColor, 1))
+            painter.drawLine(QPointF(rect.left(), py), QPointF(rect.right(), py))
+            painter.setPen(textColor)
+            label = f"{tick:.6g}"
+            painter.drawText(
+                QPointF(rect.left() - metrics.horizontalAdvance(label) - 6, py + 4),
+                label,
+            )
+        for tick in niceTicks(xs, xe, max(int(rect.width() / 120), 2)):
+            px = self.toPixel(np.array([tick]), np.array([ys]))[0, 0]
+            painter.setPen(QPen(gridColor, 1))
+            painter.drawLine(
+                QPointF(px, rect.bottom()), QPointF(px, rect.bottom() + 4)
+            )
+            painter.setPen(textColor)
+            label = str(ulog_timestamp_to_time(tick, self.timeType))
+            painter.drawText(
+                QPointF(px - metrics.horizontalAdvance(label) / 2, rect.bottom() + 18),
+                label,
+            )
+        # series
+        painter.save()
+        painter.setClipRect(rect)
+        for seriesId, _, times, values, zoom, offset, lodPyramid, color in self.series:
+            if seriesId in self.hiddenSeries:
+                continue
+            points = self.visiblePoints(times, values, zoom, offset, lodPyramid)
+            if self.chartType == "scatter":
+                painter.setPen(QPen(color, 3))
+                painter.drawPoints(toPolygon(points[np.isfinite(points).all(axis=1)]))
+            else:
+                painter.setPen(QPen(color, 1.5))
+                for segment in finiteSegments(points):
+                    painter.drawPolyline(toPolygon(segment))
+        # 指示线
+        if self.markLine is not None and xs <= self.markLine <= xe:
+            px = self.toPixel(np.array([self.markLine]), np.array([ys]))[0, 0]
+            painter.setPen(QPen(QColor("#979797"), 1, Qt.PenStyle.DashLine))
+            painter.drawLine(QPointF(px, rect.top()), QPointF(px, rect.bottom()))
+            painter.setPen(textColor)
+            painter.drawText(
+                QPointF(px + 4, rect.top() + 14),
+                ulog_timestamp_to_time(self.markLine, 1),
+            )
+        painter.restore()
+        self.paintLegend(painter, textColor)
+        if self.mousePos is not None and rect.contains(self.mousePos):
+            self.paintTooltip(painter, rect)
+
+    def paintLegend(self, painter: QPainter, textColor: QColor):
+        """
+        描述:
+            在图表顶部居中绘制图例
+        """
+        metrics = QFontMetrics(painter.font())
+        widths = [metrics.horizontalAdvance(item[1]) + 34 for item in self.series]
+        x = max((self.width() - sum(widths)) / 2, 4)
+        self.legendRects = []
+        for item, width in zip(self.series, widths):
+            seriesId, name, color = item[0], item[1], item[7]
+            hidden = seriesId in self.hiddenSeries
+            legendRect = QRectF(x, 8, width, 16)
+            self.legendRects.append((legendRect, seriesId))
+            painter.fillRect(
+                QRectF(x, 11, 20, 10), QColor("#cccccc") if hidden else color
+            )
+            painter.setPen(QColor("#cccccc") if hidden else textColor)
+            painter.drawText(QPointF(x + 25, 20), name)
+            x += width
+
+    def paintTooltip(self, painter: QPainter, rect: QRectF):
+        """
+        描述:
+            绘制十字准线和鼠标位置的属性值
+        """
+        painter.setPen(QPen(QColor("#979797"), 1, Qt.PenStyle.DashLine))
+        painter.drawLine(
+            QPointF(self.mousePos.x(), rect.top()),
+            QPointF(self.mousePos.x(), rect.bottom()),
+        )
+        painter.drawLine(
+            QPointF(rect.left(), self.mousePos.y()),
+            QPointF(rect.right(), self.mousePos.y()),
+        )
+        x, _ = self.toData(self.mousePos)
+        grid = np.array([x])
+        lines = []
+        for seriesId, name, times, values, zoom, offset, _, color in self.series:
+            if seriesId in self.hiddenSeries or len(times) == 0:
+                continue
+            value = align_column(times, values, grid, self.alignMethod)[0]
+            lines.append((color, f"{name}: {value * zoom + offset:.6g}"))
+        if len(lines) == 0:
+            return
+        metrics = QFontMetrics(painter.font())
+        title = f"时间: {ulog_timestamp_to_time(x, 1)}"
+        width = max(
+            metrics.horizontalAdvance(text) for text in [title] + [t for _, t in lines]
+        )
+        boxRect = QRectF(0, 0, width + 30, (len(lines) + 1) * 18 + 10)
+        # 提示框放在鼠标右下方,超出时翻转
+        left = self.mousePos.x() + 12
+        if left + boxRect.width() > self.width():
+            left = self.mousePos.x() - 12 - boxRect.width()
+        top = min(self.mousePos.y() + 12, self.height() - boxRect.height())
+        boxRect.moveTo(left, max(top, 0))
+        painter.setPen(QColor("#979797"))
+        painter.setBrush(QColor("#333333" if self.isDark else "#ffffff"))
+        painter.drawRoundedRect(boxRect, 4, 4)
+        painter.setPen(QColor("#eeeeee" if self.isDark else "#333333"))
+        painter.drawText(QPointF(boxRect.left() + 8, boxRect.top() + 18), title)
+        for i, (color, text) in enumerate(lines):
+            y = boxRect.top() + 18 * (i + 2)
+            painter.setBrush(color)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.drawEllipse(QPointF(boxRect.left() + 12, y - 4), 4, 4)
+            painter.setPen(QColor("#eeeeee" if self.isDark else "#333333"))
+            painter.drawText(QPointF(boxRect.left() + 20, y), text)
+
+    def wheelEvent(self, e):
+        rect = self.plotRect()
+        pos = e.position()
+        if not rect.contains(pos) or len(self.series) == 0:
+            return
+        # 以鼠标位置为中心同时缩放x轴和y轴
+        factor = 0.8 ** (e.angleDelta().y() / 120)
+        x, y = self.toData(pos)
+        xs, xe, ys, ye = self.getViewport()
+        self.setViewport(
+            (
+                x - (x - xs) * factor,
+                x + (xe - x) * factor,
+                y - (y - ys) * factor,
+                y + (ye - y) * factor,
+            )
+        )
+
+    def mousePressEvent(self, e):
+        pos = e.position()
+        for legendRect, seriesId in self.legendRects:
+            if legendRect.contains(pos):
+                self.hiddenSeries ^= {seriesId}
+                self.dataRange = self.getDataRange()
+                self.update()
+                return
+        if e.button() == Qt.MouseButton.LeftButton and self.plotRect().contains(pos):
+            self.dragStart = (pos, self.getViewport())
+
+    def mouseMoveEvent(self, e):
+        self.mousePos = e.position()
+        if self.dragStart is not None:
+            # 拖动平移
+            pos, (xs, xe, ys, ye) = self.dragStart
+            rect = self.plotRect()
+            dx = (self.mousePos.x() - pos.x()) / rect.width() * (xe - xs)
+            dy = (self.mousePos.y() - pos.y()) / rect.height() * (ye - ys)
+            self.setViewport((xs - dx, xe - dx, ys + dy, ye + dy))
+        self.update()
+
+    def mouseReleaseEvent(self, e):
+        self.dragStart = None
+
+    def mouseDoubleClickEvent(self, e):
+        self.setViewport(None)
+
+    def leaveEvent(self, e):
+        self.mousePos = None
+        self.update()
@@ -111,6 +111,8 @@ class MainWindow(MSFluentWindow):
         # 停止监听器线程
         self.themeChangedListener.terminate()
         self.themeChangedListener.deleteLater()
+        # 停止缩放重绘线程
+        self.mainInterface.zoomThread.stop()
         super().closeEvent(e)
 
     def toggleTheme(self, theme: str):
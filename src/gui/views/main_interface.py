@@ -3,8 +3,9 @@ from qfluentwidgets import (
     PushButton,
     ComboBox,
     LineEdit,
-    TreeWidget,
-    TableWidget,
+    TreeView,
+    TableView,
+    TogglePushButton,
     ProgressBar,
     FluentIcon as Icons,
     InfoBar,
@@ -13,78 +14,362 @@ from qfluentwidgets import (
     isDarkTheme,
     ToolTipFilter,
 )
-from qframelesswindow.webengine import FramelessWebEngineView
-from PyQt6.QtCore import Qt, QUrl, QObject, pyqtSlot, pyqtSignal, QThread
+from PyQt6.QtCore import (
+    Qt,
+    QUrl,
+    QObject,
+    QModelIndex,
+    pyqtSlot,
+    pyqtSignal,
+    QThread,
+)
 from PyQt6.QtWidgets import (
     QVBoxLayout,
     QHBoxLayout,
     QFileDialog,
-    QTableWidgetItem,
     QHeaderView,
-    QTreeWidgetItem,
     QFrame,
     QAbstractItemView,
     QSplitter,
 )
 from PyQt6.QtWebChannel import QWebChannel
+from loguru import logger
 import numpy as np
-import os, json, sys
+import os, json, sys, multiprocessing, threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from src.common import appConfig
-from src.gui.components import LabelInputCard, LabelTextCard, LogInfoDialog
+from src.gui.components import (
+    ExportDialog,
+    FieldTreeModel,
+    FieldFilterProxyModel,
+    LabelInputCard,
+    LabelTextCard,
+    LogInfoDialog,
+    LogTableModel,
+    NativeChartWidget,
+)
 from src.utils import *
 
 
+# LOD金字塔缩减后保留的点数为采样点数的倍数,留给采样算法选择的余量
+LOD_POINT_FACTOR = 4
+# 降采样结果缓存的最大条目数
+SERIES_CACHE_SIZE = 256
+# 未缩放时的绘图区域(xs,xe,ys,ye)
+FULL_VIEWPORT = (
+    -sys.float_info.max,
+    sys.float_info.max,
+    -sys.float_info.max,
+    sys.float_info.max,
+)
+
+
 class EChartHandler(QObject):
     echartZoomed = pyqtSignal(float, float, float, float)
+    # 发送给页面的echart配置(json),series的data为encodeArray编码的数组
+    optionsChanged = pyqtSignal(str)
+    optionsMerged = pyqtSignal(str)
+    # 绘图区域的宽度(物理像素),页面大小改变时由页面端发送
+    plotResized = pyqtSignal(float)
 
     @pyqtSlot(float, float, float, float)
     def zoomAxis(self, xS, xE, yS, yE):
         self.echartZoomed.emit(xS, xE, yS, yE)
 
+    @pyqtSlot(float)
+    def resizePlot(self, width):
+        self.plotResized.emit(width)
+
 
 class ExportThread(QThread):
-    # 当前导出进度的信号
+    # 当前导出进度的信号,参数为已写入的行数
     progressChanged = pyqtSignal(int)
-
-    exportStarted = pyqtSignal()
+    # 导出开始的信号,参数为总行数
+    exportStarted = pyqtSignal(int)
 
     exportFinished = pyqtSignal()
+    # 导出失败的信号,参数为(topic名称,错误信息)
+    exportFailed = pyqtSignal(str, str)
 
-    def __init__(self, fields: dict, parent=None):
+    def __init__(
+        self,
+        fields: TopicStore,
+        filename: str = "ulog",
+        alignment=None,
+        parent=None,
+    ):
         super().__init__(parent=parent)
         self.fields = fields
+        # npz和hdf5等单文件格式的文件名(不含扩展名)
+        self.filename = filename
+        # (时间网格,对齐方式),不为None时将所有属性对齐后导出为一张宽表
+        self.alignment = alignment
+        self.rowsWritten = 0
+
+    def onChunkWritten(self, rows: int):
+        self.rowsWritten += rows
+        self.progressChanged.emit(self.rowsWritten)
+
+    def getFilePath(self, topField: str, extension: str = ".csv") -> str:
+        return os.path.join(appConfig.get(appConfig.importFolder), topField + extension)
 
     def run(self):
-        self.exportStarted.emit()
-        delimiter = ","
-        progress = 0
-        for topField in self.fields:
-            out_file_name = os.path.join(
-                appConfig.get(appConfig.importFolder), topField + ".csv"
+        if self.alignment is not None:
+            grid, method = self.alignment
+            self.fields = TopicStore(
+                [align_fields(self.fields, grid, method, self.filename + "_aligned")]
             )
-            with open(out_file_name, "w", encoding="utf-8") as csvfile:
-                # 写入属性行
-                csvfile.write(
-                    delimiter.join([inner for inner in self.fields[topField]]) + "\n"
+        self.exportStarted.emit(
+            sum(len(topic.timestamp) for topic in self.fields.values())
+        )
+        exportFormat = appConfig.get(appConfig.exportFormat)
+        compression = appConfig.get(appConfig.exportCompression)
+        if exportFormat in SINGLE_FILE_FORMATS:
+            # 所有topic写入同一个文件
+            extension = SINGLE_FILE_FORMATS[exportFormat]
+            writer = write_fields_npz if exportFormat == "npz" else write_fields_hdf5
+            try:
+                writer(
+                    self.getFilePath(self.filename, extension),
+                    self.fields,
+                    compression,
+                    progress=self.onChunkWritten,
                 )
-                # 挨个写入属性值(按行写入)
-                for i in range(len(self.fields[topField]["timestamp"])):
-                    for k, innerField in enumerate(self.fields[topField]):
-                        if innerField == "timestamp":
-                            csvfile.write(str(self.fields[topField][innerField][i]))
-                        else:
-                            csvfile.write(
-                                str(self.fields[topField][innerField]["value"][i])
-                            )
-                        if k != len(self.fields[topField]) - 1:
-                            csvfile.write(delimiter)
-                    # 写入回车
-                    csvfile.write("\n")
-                progress += 1
-                self.progressChanged.emit(progress)
+            except Exception as e:
+                self.exportFailed.emit(self.filename + extension, repr(e))
+                return
+        elif exportFormat != "csv":
+            extension = TOPIC_FILE_FORMATS[exportFormat]
+            for topField in self.fields:
+                try:
+                    write_topic_arrow(
+                        self.getFilePath(topField, extension),
+                        self.fields[topField],
+                        exportFormat,
+                        compression,
+                    )
+                except Exception as e:
+                    self.exportFailed.emit(topField, repr(e))
+                    return
+                self.onChunkWritten(len(self.fields[topField].timestamp))
+        else:
+            workers = int(appConfig.get(appConfig.exportWorkers)) or os.cpu_count() or 1
+            workers = min(workers, len(self.fields))
+            if workers <= 1:
+                # 单个进程时直接在当前线程中导出
+                for topField in self.fields:
+                    try:
+                        write_topic_csv(
+                            self.getFilePath(topField),
+                            self.fields[topField],
+                            progress=self.onChunkWritten,
+                        )
+                    except Exception as e:
+                        self.exportFailed.emit(topField, repr(e))
+                        return
+            elif not self.runPool(workers):
+                return
         self.exportFinished.emit()
 
+    def runPool(self, workers: int) -> bool:
+        """
+        描述:
+            在进程池中并行导出各个topic,列数据通过共享内存传给子进程,
+            同时进行的topic数量有上限,避免一次性把所有数据复制到共享内存中
+
+        参数:
+            workers (int): 进程数
+
+        返回值:
+            bool: 是否全部导出成功
+        """
+        # 使用spawn方式创建子进程,避免fork带Qt线程的进程
+        context = multiprocessing.get_context("spawn")
+        pending = list(self.fields)
+        # 正在导出的topic,值为(异步结果,共享内存列表)
+        running = {}
+        try:
+            with context.Manager() as manager, context.Pool(workers) as pool:
+                progressQueue = manager.Queue()
+                while len(pending) > 0 or len(running) > 0:
+                    while len(pending) > 0 and len(running) < workers * 2:
+                        topField = pending.pop(0)
+                        names, columns = get_topic_columns(self.fields[topField])
+                        blocks, descriptors = share_columns(columns)
+                        asyncResult = pool.apply_async(
+                            write_shared_csv,
+                            (self.getFilePath(topField), names, descriptors),
+                            {"progress_queue": progressQueue},
+                        )
+                        running[topField] = (asyncResult, blocks)
+                    # 汇总所有子进程的进度
+                    while not progressQueue.empty():
+                        self.onChunkWritten(progressQueue.get())
+                    for topField in [t for t in running if running[t][0].ready()]:
+                        asyncResult, blocks = running.pop(topField)
+                        for block in blocks:
+                            block.close()
+                            block.unlink()
+                        try:
+                            asyncResult.get()
+                        except Exception as e:
+                            self.exportFailed.emit(topField, repr(e))
+                            return False
+                    self.msleep(20)
+                while not progressQueue.empty():
+                    self.onChunkWritten(progressQueue.get())
+        finally:
+            # 导出失败时释放剩余的共享内存
+            for _, blocks in running.values():
+                for block in blocks:
+                    block.close()
+                    block.unlink()
+        return True
+
+
+class LoadThread(QThread):
+    # 开始加载的信号,参数为文件数量
+    loadStarted = pyqtSignal(int)
+    # 单个文件解析完成的信号,参数为(文件序号,已完成数量)
+    fileLoaded = pyqtSignal(int, int)
+    # 全部文件解析完成的信号,参数为按打开顺序排列的解析结果
+    loadFinished = pyqtSignal(list)
+    # 加载被取消的信号
+    loadCanceled = pyqtSignal()
+    # 加载失败的信号,参数为(文件路径,错误信息)
+    loadFailed = pyqtSignal(str, str)
+
+    def __init__(self, fileList: list, function=load_ulog, args=(), parent=None):
+        super().__init__(parent=parent)
+        self.fileList = fileList
+        # 子进程中对每个文件调用的解析函数,调用方式为function(filepath, *args)
+        self.function = function
+        self.args = args
+        self.canceled = False
+
+    def cancel(self):
+        """
+        取消加载,正在解析的子进程会被直接终止
+        """
+        self.canceled = True
+
+    def run(self):
+        self.loadStarted.emit(len(self.fileList))
+        results = [None] * len(self.fileList)
+        # 使用spawn方式创建子进程,避免fork带Qt线程的进程
+        context = multiprocessing.get_context("spawn")
+        processes = min(len(self.fileList), os.cpu_count() or 1)
+        with context.Pool(processes=processes) as pool:
+            # 所有文件同时提交给进程池解析
+            asyncResults = [
+                pool.apply_async(self.function, (filepath, *self.args))
+                for filepath in self.fileList
+            ]
+            pending = list(range(len(self.fileList)))
+            while len(pending) > 0:
+                if self.canceled:
+                    # 退出with时会终止进程池
+                    self.loadCanceled.emit()
+                    return
+                for index in [i for i in pending if asyncResults[i].ready()]:
+                    pending.remove(index)
+                    try:
+                        results[index] = asyncResults[index].get()
+                        result = results[index]
+                        if isinstance(result, dict) and "cache_key" in result:
+                            # 在主进程中以内存映射的方式打开缓存
+                            results[index] = UlogCache(
+                                appConfig.get(appConfig.cacheFolder)
+                            ).load(result["cache_key"])
+                    except Exception as e:
+                        self.loadFailed.emit(self.fileList[index], repr(e))
+                        return
+                    self.fileLoaded.emit(index, len(self.fileList) - len(pending))
+                self.msleep(20)
+        self.loadFinished.emit(results)
+
+
+class ZoomThread(QThread):
+    """
+    描述:
+        缩放重绘的后台线程,只保留最新的一次请求:
+        新请求会覆盖还没开始计算的旧请求,正在计算的旧请求会在下一个属性处中止,
+        已经过期的结果不会发出
+    """
+
+    # 计算完成的信号,参数为(请求编号,计算函数的参数,series)
+    seriesReady = pyqtSignal(int, tuple, list)
+    # 计算失败的信号,参数为(请求编号,错误信息)
+    seriesFailed = pyqtSignal(int, str)
+
+    def __init__(self, function, parent=None):
+        super().__init__(parent=parent)
+        # 计算函数,调用方式为function(*args, canceled=判断请求是否过期的函数)
+        self.function = function
+        self.condition = threading.Condition()
+        self.request = None
+        # 最新请求的编号
+        self.generation = 0
+        self.stopped = False
+
+    def submit(self, generation: int, args: tuple):
+        """
+        描述:
+            提交新的请求,覆盖还没有开始计算的请求
+
+        参数:
+            generation (int): 请求编号,必须递增
+            args (tuple): 计算函数的参数
+        """
+        with self.condition:
+            self.generation = generation
+            self.request = (generation, args)
+            self.condition.notify()
+
+    def invalidate(self, generation: int):
+        """
+        描述:
+            使编号小于generation的请求全部过期,如完整重绘图像时
+
+        参数:
+            generation (int): 新的请求编号
+        """
+        with self.condition:
+            self.generation = generation
+            self.request = None
+
+    def isStale(self, generation: int) -> bool:
+        return generation != self.generation
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.request = None
+            self.condition.notify()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.request is None and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                generation, args = self.request
+                self.request = None
+            try:
+                series = self.function(
+                    *args, canceled=lambda: self.isStale(generation)
+                )
+            except Exception as e:
+                # 单次请求失败不影响之后的请求
+                logger.exception("缩放重绘计算失败")
+                self.seriesFailed.emit(generation, repr(e))
+                continue
+            if series is not None and not self.isStale(generation):
+                self.seriesReady.emit(generation, args, series)
+
 
 class MainInterface(CardWidget):
 
@@ -117,6 +402,12 @@ class MainInterface(CardWidget):
         )
         self.openButton.setToolTipDuration(1000)
         self.openButton.installEventFilter(ToolTipFilter(self.openButton))
+        # 取消加载按钮
+        self.cancelButton = PushButton(Icons.CLOSE, "取消加载")
+        self.cancelButton.setHidden(True)
+        self.cancelButton.setToolTip("取消正在进行的ulg日志解析")
+        self.cancelButton.setToolTipDuration(1000)
+        self.cancelButton.installEventFilter(ToolTipFilter(self.cancelButton))
         # 日志参数
         self.parameterButton = PushButton(Icons.INFO, "日志参数")
         self.parameterButton.setToolTip(
@@ -132,15 +423,19 @@ class MainInterface(CardWidget):
         self.viewSelectBox.setToolTipDuration(1000)
         self.viewSelectBox.installEventFilter(ToolTipFilter(self.viewSelectBox))
         # 导出按钮
-        self.exportButton = PushButton(Icons.IMAGE_EXPORT, "导出CSV")
+        self.exportButton = PushButton(Icons.IMAGE_EXPORT, "导出数据")
         self.exportButton.setHidden(True)
-        self.exportButton.setToolTip("将ulg日志数据导出为csv文件")
+        self.exportButton.setToolTip(
+            "将ulg日志数据导出为csv、npz、hdf5、parquet或feather文件"
+        )
         self.exportButton.setToolTipDuration(1000)
         self.exportButton.installEventFilter(ToolTipFilter(self.exportButton))
         # 布局设置
         headerLayout.setContentsMargins(5, 5, 5, 5)
         headerLayout.addWidget(self.openButton)
         headerLayout.addSpacing(4)
+        headerLayout.addWidget(self.cancelButton)
+        headerLayout.addSpacing(4)
         headerLayout.addWidget(self.parameterButton)
         headerLayout.addSpacing(4)
         headerLayout.addWidget(self.viewSelectBox)
@@ -151,7 +446,13 @@ class MainInterface(CardWidget):
         return headerLayout
 
     def initFieldTreeWidget(self):
-        self.fieldTree = TreeWidget()
+        # 属性树,勾选状态保存在模型中,搜索通过代理模型过滤
+        self.fieldModel = FieldTreeModel(self)
+        self.fieldProxy = FieldFilterProxyModel(self)
+        self.fieldProxy.setSourceModel(self.fieldModel)
+        self.fieldTree = TreeView()
+        self.fieldTree.setModel(self.fieldProxy)
+        self.fieldTree.setUniformRowHeights(True)
         # 隐藏表头
         self.fieldTree.setHeaderHidden(True)
 
@@ -172,11 +473,25 @@ class MainInterface(CardWidget):
         self.fieldZoom.setLayout(layout)
 
     def initLogTableWidget(self):
-        # 日志表格
-        self.logTable = TableWidget()
+        # 日志等级和时间过滤
+        self.logLevelBox = ComboBox()
+        self.logLevelBox.addItems(["全部等级"] + LogTableModel.LEVELS[:-1])
+        self.logLevelBox.setToolTip("只显示该等级及更严重的日志")
+        self.logLevelBox.installEventFilter(ToolTipFilter(self.logLevelBox))
+        self.logRangeButton = TogglePushButton("图表范围")
+        self.logRangeButton.setToolTip("只显示图表当前时间范围内的日志")
+        self.logRangeButton.installEventFilter(ToolTipFilter(self.logRangeButton))
+        self.logFilterLayout = QHBoxLayout()
+        self.logFilterLayout.addWidget(self.logLevelBox, 1)
+        self.logFilterLayout.addWidget(self.logRangeButton)
+        # 日志表格,数据由模型提供,只有可见的行会被读取
+        self.logModel = LogTableModel(self)
+        self.logTable = TableView()
+        self.logTable.setModel(self.logModel)
         self.logTable.horizontalHeader().setMinimumWidth(100)
+        # 按内容调整列宽时只采样部分行
         self.logTable.horizontalHeader().setSectionResizeMode(
-            QHeaderView.ResizeMode.Stretch
+            QHeaderView.ResizeMode.ResizeToContents
         )
         self.logTable.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
         self.logTable.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
@@ -184,12 +499,9 @@ class MainInterface(CardWidget):
         # 启用边框并设置圆角
         self.logTable.setBorderVisible(True)
         self.logTable.setBorderRadius(8)
-        # 设置行列数
-        self.logTable.setColumnCount(3)
-        # 设置水平表头
-        self.logTable.setHorizontalHeaderLabels(["时间", "日志等级", "消息"])
-        # 隐藏垂直表头
+        # 隐藏垂直表头,固定行高避免逐行计算高度
         self.logTable.verticalHeader().hide()
+        self.logTable.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         # 单选模式
         self.logTable.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         # 选中整行
@@ -200,6 +512,12 @@ class MainInterface(CardWidget):
         self.logTable.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         # 设置换行
         self.logTable.setWordWrap(False)
+        # 点击表头排序,第三次点击恢复原始顺序
+        self.logTable.horizontalHeader().setSortIndicatorClearable(True)
+        self.logTable.horizontalHeader().setSortIndicator(
+            -1, Qt.SortOrder.AscendingOrder
+        )
+        self.logTable.setSortingEnabled(True)
 
     def initLeftWidget(self):
         """
@@ -219,6 +537,7 @@ class MainInterface(CardWidget):
         leftLayout.addWidget(self.searchEdit)
         leftLayout.addWidget(self.fieldTree)
         leftLayout.addWidget(self.fieldZoom)
+        leftLayout.addLayout(self.logFilterLayout)
         leftLayout.addWidget(self.logTable)
         # 左侧窗口
         leftWidget = QFrame()
@@ -231,6 +550,14 @@ class MainInterface(CardWidget):
         """
         初始化右侧组件
         """
+        # 原生绘图不创建浏览器进程
+        self.useNativeChart = appConfig.get(appConfig.chartRenderer) == "native"
+        if self.useNativeChart:
+            self.chartWidget = NativeChartWidget(self)
+            return self.chartWidget
+        # 只在使用echart时导入,避免原生绘图时加载QtWebEngine
+        from qframelesswindow.webengine import FramelessWebEngineView
+
         self.htmlWidget = FramelessWebEngineView(self)
         self.htmlWidget.setStyleSheet("background-color: transparent;")
         # 打开本地html文件
@@ -304,28 +631,58 @@ class MainInterface(CardWidget):
         """
         # 打开文件按钮
         self.openButton.clicked.connect(self.openUlog)
+        # 取消加载按钮
+        self.cancelButton.clicked.connect(self.cancelLoad)
         # 日志参数按钮
         self.parameterButton.clicked.connect(self.openInfoDialog)
         # 视图选项
         self.viewSelectBox.currentIndexChanged.connect(lambda: self.drawChart())
         # 导出按钮
-        self.exportButton.clicked.connect(self.exportCSV)
+        self.exportButton.clicked.connect(self.exportData)
         # 搜索框
         self.searchEdit.textChanged.connect(self.onSearchTextChanged)
         # 参数列表
-        self.fieldTree.itemChanged.connect(self.onFieldChanged)
-        self.fieldTree.itemClicked.connect(self.onFieldClicked)
+        self.fieldModel.checkStateChanged.connect(self.updateChart)
+        self.fieldTree.clicked.connect(self.onFieldClicked)
         # 日志表格双击事件
-        self.logTable.itemDoubleClicked.connect(self.onLogTableDoubleClicked)
+        self.logTable.doubleClicked.connect(self.onLogTableDoubleClicked)
+        # 日志过滤
+        self.logLevelBox.currentIndexChanged.connect(self.onLogFilterChanged)
+        self.logRangeButton.toggled.connect(self.onLogFilterChanged)
         # 缩放参数
         self.fieldOffsetCard.editingFinished.connect(self.onOffsetChanged)
         self.fieldZoomCard.editingFinished.connect(self.onZoomChanged)
-        # 设置背景颜色
-        self.htmlWidget.loadFinished.connect(
-            lambda: self.toggleEchartTheme(isDarkTheme())
-        )
-        # js和python间事件注册
-        self.echartHandler.echartZoomed.connect(self.zoomDrawChart)
+        if self.useNativeChart:
+            self.chartWidget.setDarkTheme(isDarkTheme())
+            self.chartWidget.viewportChanged.connect(self.onChartViewportChanged)
+        else:
+            # 设置背景颜色
+            self.htmlWidget.loadFinished.connect(
+                lambda: self.toggleEchartTheme(isDarkTheme())
+            )
+            # js和python间事件注册
+            self.echartHandler.echartZoomed.connect(self.zoomDrawChart)
+            self.echartHandler.plotResized.connect(self.onPlotResized)
+        # 缩放重绘在后台线程中计算
+        self.chartGeneration = 0
+        # 页面上已有的series,id为"顶层属性名.属性名",值为(缩放,偏移)
+        self.chartSeries = {}
+        # 页面上数据对应的绘图区域和最新请求的绘图区域
+        self.chartViewport = self.zoomViewport = FULL_VIEWPORT
+        # 页面上绘图区域的宽度(物理像素),页面报告之前为0
+        self.plotWidth = 0
+        # 页面上数据使用的采样点数
+        self.chartPointNums = None
+        # 降采样结果缓存,数据重新加载后自动失效
+        self.seriesCache = SeriesCache(SERIES_CACHE_SIZE)
+        # 并行预处理各属性的(线程数,线程池),第一次使用时创建
+        self.seriesPool = None
+        self.zoomThread = ZoomThread(self.seriesPreprocessing, parent=self)
+        self.zoomThread.seriesReady.connect(self.onZoomSeriesReady)
+        self.zoomThread.seriesFailed.connect(self.onZoomSeriesFailed)
+        self.zoomThread.start()
+        # 正在加载时到达的按需加载请求,当前加载完成后依次执行
+        self.loadQueue = []
 
     def openUlog(self):
         """
@@ -333,94 +690,153 @@ class MainInterface(CardWidget):
         """
         # 在打开文件前,存储已经展示了哪些属性
         displayedFields = defaultdict(dict)
-        for i in range(self.fieldTree.topLevelItemCount()):
-            topItem = self.fieldTree.topLevelItem(i)
-            topField = topItem.text(0)
-            # 遍历子项
-            for j in range(topItem.childCount()):
-                innerItem = topItem.child(j)
-                if innerItem.checkState(0) == Qt.CheckState.Checked:
-                    # 被选中了
-                    innerField = innerItem.text(0)
-                    # 原地修改
-                    displayedFields[topField][innerField] = {
-                        "zoom": self.fields[topField][innerField]["zoom"],
-                        "offset": self.fields[topField][innerField]["offset"],
-                    }
+        for topField, innerField in self.fieldModel.getCheckedFields():
+            zoom, offset = self.getTransform(topField, innerField)
+            displayedFields[topField][innerField] = {"zoom": zoom, "offset": offset}
         # 使用QFileDialog打开文件对话框
         fileList, _ = QFileDialog.getOpenFileNames(
             self, "选择文件", "", "ulog文件(*.ulg)"
         )
         if len(fileList) == 0:
             return
+        # 排队的按需加载请求属于旧的文件
+        self.loadQueue = []
+        # 在子进程中并行解析所有文件,按需加载模式下只建立属性索引
+        lazy = appConfig.get(appConfig.lazyLoad)
+        if appConfig.get(appConfig.cacheEnabled) and not lazy:
+            # 命中缓存时直接映射缓存中的数组,按需加载模式下不计算哈希也不写入缓存
+            self.loadThread = LoadThread(
+                fileList=fileList,
+                function=load_ulog_cached,
+                args=(
+                    appConfig.get(appConfig.cacheFolder),
+                    int(appConfig.get(appConfig.cacheMaxSize)) * 1024 * 1024,
+                ),
+                parent=self.window(),
+            )
+        else:
+            self.loadThread = LoadThread(
+                fileList=fileList,
+                args=(lazy,),
+                parent=self.window(),
+            )
+        self.loadThread.loadStarted.connect(self.onLoadStarted)
+        self.loadThread.fileLoaded.connect(self.onFileLoaded)
+        self.loadThread.loadFinished.connect(
+            lambda results: self.onLoadFinished(fileList, results, displayedFields)
+        )
+        self.loadThread.loadCanceled.connect(self.onLoadCanceled)
+        self.loadThread.loadFailed.connect(self.onLoadFailed)
+        self.loadThread.start()
+
+    def cancelLoad(self):
+        """
+        取消正在进行的日志加载
+        """
+        if hasattr(self, "loadThread") and self.loadThread.isRunning():
+            self.loadThread.cancel()
+
+    def onLoadStarted(self, count: int):
+        """
+        日志加载开始的函数
+        """
+        self.openButton.setEnabled(False)
+        self.cancelButton.setHidden(False)
+        self.statusWidget.setText(f"正在解析文件(0/{count})")
+        self.statusProgressBar.setRange(0, count)
+        self.statusProgressBar.setValue(0)
+        self.statusProgressBar.setHidden(False)
+
+    def onFileLoaded(self, index: int, finished: int):
+        """
+        描述:
+            单个日志文件解析完成的函数
+
+        参数:
+            index (int): 解析完成的文件序号
+            finished (int): 已经解析完成的文件数量
+        """
+        filename = os.path.basename(self.loadThread.fileList[index])
+        self.statusWidget.setText(
+            f"正在解析文件({finished}/{len(self.loadThread.fileList)}),已完成:{filename}"
+        )
+        self.statusProgressBar.setValue(finished)
+
+    def onLoadStopped(self):
+        """
+        日志加载结束(完成、取消或失败)后恢复界面
+        """
+        # 结束信号是线程发出的最后一个信号,等待线程退出后isRunning才能反映是否空闲
+        self.loadThread.wait()
+        self.openButton.setEnabled(True)
+        self.cancelButton.setHidden(True)
+        self.statusProgressBar.setHidden(True)
+
+    def onLoadCanceled(self):
+        """
+        日志加载被取消的函数
+        """
+        self.onLoadStopped()
+        self.loadQueue = []
+        self.statusWidget.setText("状态:已取消加载")
+
+    def onLoadFailed(self, filepath: str, error: str):
+        """
+        日志加载失败的函数
+        """
+        self.onLoadStopped()
+        self.loadQueue = []
+        self.statusWidget.setText("状态:加载失败")
+        InfoBar.error(
+            title="错误",
+            content=f"解析{os.path.basename(filepath)}失败:{error}",
+            duration=5000,
+            parent=self,
+        )
+
+    def onLoadFinished(self, fileList: list, results: list, displayedFields: dict):
+        """
+        描述:
+            所有日志文件解析完成后合并数据并显示
+
+        参数:
+            fileList (list): 打开的文件列表
+            results (list): 按文件顺序排列的load_ulog解析结果
+            displayedFields (dict): 打开文件前已经展示的属性及其zoom和offset
+        """
+        self.onLoadStopped()
         self.exportButton.setHidden(False)
         # 清空数据
         files = ",".join(map(os.path.basename, fileList))
         self.statusWidget.setText(f"当前打开文件:{files}")
         self.clearData()
+        self.fileList = fileList
         # 遍历所有打开的日志
-        for filepath in fileList:
-            ulog = ULog(filepath)
+        for result in results:
             if len(self.initialParameters) == 0:
                 # 初始化参数以第一个文件为主
-                self.initialParameters = get_initial_parameters(ulog)
+                self.initialParameters = result["initial_parameters"]
             # 拼接日志
-            self.logMesasges += get_logged_message(ulog)
-            self.changedParameters += get_change_parameters(ulog)
-            # 拼接参数
-            if len(self.fields) == 0:
-                self.fields = get_fields_dict(ulog)
-            else:
-                fields = get_fields_dict(ulog)
-                # 拼接数据
-                for topKey, innerFields in self.fields.items():
-                    if topKey not in fields:
-                        continue
-                    for innerKey, fieldData in innerFields.items():
-                        if innerKey in fields[topKey]:
-                            if innerKey == "timestamp":
-                                self.fields[topKey][innerKey] = np.concatenate(
-                                    (fieldData, fields[topKey][innerKey]), axis=0
-                                )
-                            else:
-                                self.fields[topKey][innerKey]["value"] = np.concatenate(
-                                    (
-                                        fieldData["value"],
-                                        fields[topKey][innerKey]["value"],
-                                    ),
-                                    axis=0,
-                                )
+            self.logMesasges += result["logged_messages"]
+            self.changedParameters += result["changed_parameters"]
+        # 拼接参数
+        stores = [result["fields"] for result in results]
+        if all(topic.loaded for store in stores for topic in store.values()):
+            self.fields = merge_topic_stores(stores)
+        else:
+            self.fields = merge_topic_indexes(stores)
         # 日志信息以最后一个为准
-        self.ulogInfo, errors = get_ulog_info(ulog)
+        self.ulogInfo, errors = results[-1]["info"]
         # 显示属性
         self.displayFields()
         # 勾选对应属性,并赋予offset和zoom
-        self.fieldTree.blockSignals(True)
-        for i in range(self.fieldTree.topLevelItemCount()):
-            topItem = self.fieldTree.topLevelItem(i)
-            topField = topItem.text(0)
-            checked = 0
-            if topField in displayedFields:
-                # 如果属性存在则遍历子项
-                for j in range(topItem.childCount()):
-                    innerItem = topItem.child(j)
-                    innerField = innerItem.text(0)
-                    if innerField in displayedFields[topField]:
-                        checked += 1
-                        innerItem.setCheckState(0, Qt.CheckState.Checked)
-                        # 更新zoom和offset
-                        fieldData = displayedFields[topField][innerField]
-                        self.fields[topField][innerField].update(
-                            {"zoom": fieldData["zoom"], "offset": fieldData["offset"]}
-                        )
-            # 检查父项,是否需要勾选
-            if checked == topItem.childCount():
-                topItem.setCheckState(0, Qt.CheckState.Checked)
-            elif checked > 0:
-                topItem.setCheckState(0, Qt.CheckState.PartiallyChecked)
-            else:
-                topItem.setCheckState(0, Qt.CheckState.Unchecked)
-        self.fieldTree.blockSignals(False)
+        self.fieldModel.setCheckedFields(displayedFields)
+        for topField, innerField in self.fieldModel.getCheckedFields():
+            transform = displayedFields[topField][innerField]
+            self.fieldTransforms[(topField, innerField)] = (
+                transform["zoom"],
+                transform["offset"],
+            )
         # 显示数据
         self.displayLogMessage()
         # 错误提示
@@ -443,11 +859,11 @@ class MainInterface(CardWidget):
         )
         w.exec()
 
-    def onExportStart(self):
+    def onExportStart(self, rows: int):
         """
         导出开始的函数
         """
-        self.statusProgressBar.setRange(0, len(self.fields))
+        self.statusProgressBar.setRange(0, rows)
         self.statusProgressBar.setHidden(False)
 
     def onExportFinised(self):
@@ -463,36 +879,162 @@ class MainInterface(CardWidget):
             parent=self.window(),
         )
 
-    def exportCSV(self):
+    def onExportFailed(self, topField: str, error: str):
+        """
+        导出失败的函数
+        """
+        self.statusProgressBar.setHidden(True)
+        InfoBar.error(
+            title="错误",
+            content=f"导出{topField}失败:{error}",
+            duration=5000,
+            parent=self,
+        )
+
+    def exportData(self):
+        """
+        选择导出的属性和时间范围,默认为勾选的属性和图表当前的缩放范围
+        """
+        checkedFields = defaultdict(list)
+        for topField, innerField in self.fieldModel.getCheckedFields():
+            checkedFields[topField].append(innerField)
+        dialog = ExportDialog(
+            self.fields,
+            checkedFields=checkedFields,
+            timeRange=self.getChartTimeRange(),
+            alignMethod=appConfig.get(appConfig.alignMethod),
+            parent=self.window(),
+        )
+        if not dialog.exec():
+            return
+        selection = dialog.getSelection()
+        if len(selection) == 0:
+            return
+        start, end = dialog.getTimeRange()
+        self.exportSelection(
+            selection, start, end, dialog.getStep(), dialog.getAlignment()
+        )
+
+    def getChartTimeRange(self):
+        """
+        描述:
+            获取图表当前缩放后的时间范围
+
+        返回值:
+            tuple: (起始,终止)时间戳,图表未缩放时为None
         """
-        将ulg数据导出为csv
+        if self.useNativeChart:
+            viewport = self.chartWidget.viewport
+        else:
+            viewport = None if self.zoomViewport == FULL_VIEWPORT else self.zoomViewport
+        return None if viewport is None else viewport[:2]
+
+    def exportSelection(
+        self, selection: dict, start, end, step: int, alignment: dict = None
+    ):
         """
-        exportThread = ExportThread(fields=self.fields, parent=self.window())
+        描述:
+            导出选中的属性,通过二分查找截取时间范围,按需加载模式下只加载选中的topic
+
+        参数:
+            selection (dict): {topic名称: 属性名列表}
+            start (float): 起始时间戳,None表示从头开始
+            end (float): 终止时间戳,None表示到结尾
+            step (int): 抽取间隔
+            alignment (dict, optional): ExportDialog.getAlignment的结果,
+                不为None时对齐到同一时间网格导出为一张宽表
+        """
+        topics = list(selection)
+        if alignment is not None and alignment["reference"] is not None:
+            topics.append(alignment["reference"])
+        unloadedTopics = [
+            topField
+            for topField in dict.fromkeys(topics)
+            if not self.fields[topField].loaded
+        ]
+        if len(unloadedTopics) > 0:
+            self.loadTopics(
+                unloadedTopics,
+                callback=lambda: self.exportSelection(
+                    selection, start, end, step, alignment
+                ),
+            )
+            return
+        filename = os.path.splitext(os.path.basename(self.fileList[0]))[0]
+        if alignment is None:
+            exportThread = ExportThread(
+                fields=select_fields(self.fields, selection, start, end, step),
+                filename=filename,
+                parent=self.window(),
+            )
+        else:
+            # 对齐时使用完整的数据,时间范围只作用于时间网格,保证网格起点也能取到之前的点
+            fields = select_fields(self.fields, selection)
+            grid = self.getAlignGrid(fields, start, end, alignment)[::step]
+            exportThread = ExportThread(
+                fields=fields,
+                filename=filename,
+                alignment=(grid, alignment["method"]),
+                parent=self.window(),
+            )
         # 导出开始
         exportThread.exportStarted.connect(self.onExportStart)
         # 导出完成
         exportThread.exportFinished.connect(self.onExportFinised)
+        # 导出失败
+        exportThread.exportFailed.connect(self.onExportFailed)
         # 导出进行中
         exportThread.progressChanged.connect(
             lambda value: self.statusProgressBar.setValue(value)
         )
         exportThread.start()
 
-    def onFieldClicked(self, item: QTreeWidgetItem, column: int):
+    def getAlignGrid(
+        self, fields: TopicStore, start, end, alignment: dict
+    ) -> np.ndarray:
+        """
+        描述:
+            获取对齐导出的时间网格,未指定时间范围时使用所有选中topic的时间范围
+
+        参数:
+            fields (dict): 选中的属性
+            start (float): 起始时间戳,None表示不限制
+            end (float): 终止时间戳,None表示不限制
+            alignment (dict): ExportDialog.getAlignment的结果
+
+        返回值:
+            np.ndarray: 时间网格
+        """
+        if alignment["reference"] is not None:
+            times = self.fields[alignment["reference"]].timestamp
+            return reference_time_grid(times, start, end)
+        times = [topic.timestamp for topic in fields.values() if len(topic.timestamp)]
+        if len(times) == 0:
+            return np.empty(0, dtype=np.uint64)
+        if start is None:
+            start = min(int(t[0]) for t in times)
+        if end is None:
+            end = max(int(t[-1]) for t in times)
+        return make_time_grid(start, end, alignment["rate"])
+
+    def onFieldClicked(self, index: QModelIndex):
         """
         描述:
             点击某个属性的处理函数
 
         参数:
-            item (QTreeWidgetItem): 树的子项
-            column (int): 第几列
+            index (QModelIndex): 属性树代理模型中的索引
         """
-        parent = item.parent()
-        if parent:
-            topField, innerField = parent.text(column), item.text(column)
-            data = self.fields[topField][innerField]
+        topField, innerField = self.fieldModel.getField(
+            self.fieldProxy.mapToSource(index)
+        )
+        if innerField is not None:
+            zoom, offset = self.getTransform(topField, innerField)
+            # 属性翻译按topic名称查找,同名topic的所有实例共用
             translate = (
-                getattr(self, "fieldConfig", {}).get(topField, {}).get(innerField)
+                getattr(self, "fieldConfig", {})
+                .get(self.fields[topField].name, {})
+                .get(innerField)
             )
             # 改变数据
             self.fieldLabelCard.setText(
@@ -500,138 +1042,100 @@ class MainInterface(CardWidget):
                 if translate
                 else f"{topField}.{innerField}"
             )
-            self.fieldOffsetCard.setInitValue(data["offset"])
-            self.fieldZoomCard.setInitValue(data["zoom"])
+            self.fieldOffsetCard.setInitValue(offset)
+            self.fieldZoomCard.setInitValue(zoom)
             # 设置当前选中了那个元素
             self.selectTopField, self.selectInnerField = topField, innerField
 
-    def onFieldChanged(self, item: QTreeWidgetItem, column: int):
-        # 禁止再次发送信号
-        self.fieldTree.blockSignals(True)
-        # 联动子节点状态
-        if item.checkState(column) != Qt.CheckState.PartiallyChecked:
-            # 存储节点状态防止联动时导致状态进行改变
-            state = item.checkState(column)
-            # 遍历所有子节点,将其状态设置为父节点的状态
-            for i in range(item.childCount()):
-                child = item.child(i)
-                # 如果没有设置为隐藏,则设置其状态
-                if not child.isHidden():
-                    child.setCheckState(column, state)
-        # 联动父节点状态
-        parent = item.parent()
-        if parent is not None:
-            # 统计子节点的选中和未选中状态
-            visible_children = [
-                child
-                for i in range(parent.childCount())
-                if not (child := parent.child(i)).isHidden()
-            ]
-            checked = sum(
-                child.checkState(column) == Qt.CheckState.Checked
-                for child in visible_children
-            )
-            unchecked = sum(
-                child.checkState(column) == Qt.CheckState.Unchecked
-                for child in visible_children
-            )
-            # 设置父节点状态
-            if checked == len(visible_children):
-                parent.setCheckState(column, Qt.CheckState.Checked)  # 全选
-            elif unchecked == len(visible_children):
-                parent.setCheckState(column, Qt.CheckState.Unchecked)  # 未选中
-            else:
-                parent.setCheckState(column, Qt.CheckState.PartiallyChecked)  # 部分选中
-        # 可以再次触发信号
-        self.fieldTree.blockSignals(False)
-        # 绘制图表
-        self.drawChart()
-
-    def onLogTableDoubleClicked(self, item: QTableWidgetItem):
-        # 获取行列
-        timeItem = self.logTable.item(item.row(), 0)
+    def onLogTableDoubleClicked(self, index: QModelIndex):
         # 在图像上添加一列数据
-        timestamp = timeItem.text()
-        timeValue = (
-            int(timestamp[0:2]) * 6e7
-            + int(timestamp[3:5]) * 1e6
-            + int(timestamp[6:]) * 1e3
-        )
+        timeValue = self.logModel.getTimestamp(index.row())
         # 在右侧添加一条垂线
+        if self.useNativeChart:
+            self.chartWidget.setMarkLine(timeValue)
+            return
         self.htmlWidget.page().runJavaScript(
             f"""
-            setMarkLine({timeValue})
+            setMarkLine({timeValue}, {json.dumps(self.getReadout(timeValue))})
             """
         )
 
+    def onLogFilterChanged(self):
+        """
+        按日志等级和图表时间范围过滤日志
+        """
+        level = self.logLevelBox.currentIndex()
+        self.logModel.setFilter(
+            maxLevel=level - 1 if level > 0 else None,
+            timeRange=(
+                self.getChartTimeRange() if self.logRangeButton.isChecked() else None
+            ),
+        )
+
+    @debounce(100)
+    def onChartViewportChanged(self):
+        """
+        描述:
+            图表的时间范围改变,按图表范围过滤时重新过滤日志
+        """
+        if self.logRangeButton.isChecked():
+            self.onLogFilterChanged()
+
+    def getReadout(self, timeValue: float) -> list:
+        """
+        描述:
+            使用原始数据读取勾选的属性在某一时刻的值,不受图表采样影响
+
+        参数:
+            timeValue (float): 时间戳
+
+        返回值:
+            list: "属性名: 值"字符串列表
+        """
+        method = appConfig.get(appConfig.alignMethod)
+        grid = np.array([timeValue])
+        readout = []
+        for top, inner, times, values, zoom, offset, _ in self.getCheckedSeries(
+            useLod=False
+        ):
+            value = align_column(times, values, grid, method)[0]
+            readout.append(f"{top}.{inner}: {value * zoom + offset:.6g}")
+        return readout
+
+    def getTransform(self, topField: str, innerField: str) -> tuple:
+        """
+        描述:
+            获取属性的显示变换
+
+        返回值:
+            tuple: (缩放,偏移),没有设置过时为(1.0,0.0)
+        """
+        return self.fieldTransforms.get((topField, innerField), (1.0, 0.0))
+
     def onOffsetChanged(self, value: float):
         if self.selectTopField and self.selectInnerField:
-            self.fields[self.selectTopField][self.selectInnerField]["offset"] = value
+            key = (self.selectTopField, self.selectInnerField)
+            self.fieldTransforms[key] = (self.getTransform(*key)[0], value)
             # 重绘图表
-            self.drawChart()
+            self.updateChart()
 
     def onZoomChanged(self, value: float):
         if self.selectTopField and self.selectInnerField:
-            self.fields[self.selectTopField][self.selectInnerField]["zoom"] = value
+            key = (self.selectTopField, self.selectInnerField)
+            self.fieldTransforms[key] = (value, self.getTransform(*key)[1])
             # 重绘图表
-            self.drawChart()
+            self.updateChart()
 
-    @debounce(1000)
-    @throttle(500)
+    @debounce(150)
     def onSearchTextChanged(self, text: str):
         """
         描述:
-            用于展示搜索的函数
+            用于展示搜索的函数,支持子串和模糊匹配
 
         参数:
             text (str): 参数
         """
-        for i in range(self.fieldTree.topLevelItemCount()):
-            topItem = self.fieldTree.topLevelItem(i)
-            innerHidenCount = 0
-            # 遍历子项
-            for j in range(topItem.childCount()):
-                innerItem = topItem.child(j)
-                if text not in innerItem.text(0):
-                    innerItem.setHidden(True)
-                    innerHidenCount += 1
-                else:
-                    innerItem.setHidden(False)
-            # 如果隐藏的子项和节点的子项数量相等且父项中不存在text,则将topItem也隐藏
-            if innerHidenCount == topItem.childCount() and text not in topItem.text(0):
-                topItem.setHidden(True)
-            else:
-                topItem.setHidden(False)
-        # 最后检测一遍父项状态
-        for i in range(self.fieldTree.topLevelItemCount()):
-            topItem = self.fieldTree.topLevelItem(i)
-            checked = 0
-            unchecked = 0
-            count = 0
-            for j in range(topItem.childCount()):
-                innerItem = topItem.child(j)
-                if not innerItem.isHidden():
-                    checked += innerItem.checkState(0) == Qt.CheckState.Checked
-                    unchecked += innerItem.checkState(0) == Qt.CheckState.Unchecked
-                    count += 1
-            # 如果checked项目数量和topItem的child数量相等
-            topState = topItem.checkState(0)
-            topNextState = None
-            if checked == count and topState != Qt.CheckState.Checked:
-                topNextState = Qt.CheckState.Checked
-            elif unchecked == count and topState != Qt.CheckState.Unchecked:
-                topNextState = Qt.CheckState.Unchecked
-            elif (
-                checked > 0
-                and unchecked > 0
-                and topState != Qt.CheckState.PartiallyChecked
-            ):
-                topNextState = Qt.CheckState.PartiallyChecked
-                # 设置其状态
-            if topNextState is not None:
-                self.fieldTree.blockSignals(True)
-                topItem.setCheckState(0, topNextState)
-                self.fieldTree.blockSignals(False)
+        self.fieldProxy.setFilterText(text)
 
     def clearData(self):
         """
@@ -646,55 +1150,49 @@ class MainInterface(CardWidget):
         # 变化的参数
         self.changedParameters = []
         # 属性参数信息
-        self.fields = {}
+        self.fields = TopicStore()
+        # 属性的显示变换,{(topic的label,属性名): (缩放,偏移)},与数据分开保存
+        self.fieldTransforms = {}
+        # 属性的LOD金字塔,第一次绘制时创建
+        self.lodPyramids = {}
+        # 缓存引用了旧的数组,清空以释放内存
+        if hasattr(self, "seriesCache"):
+            self.seriesCache.clear()
+        # 页面上的series属于旧的数据,下次绘制时完整重绘
+        self.chartSeries = {}
         # ulog信息
         self.ulogInfo = {}
         # 选择信息
         self.selectTopField = None
         self.selectInnerField = None
         # 清除表格信息
-        self.logTable.clear()
-        self.logTable.setRowCount(0)
-        self.fieldTree.clear()
+        self.logLevelBox.setCurrentIndex(0)
+        self.logRangeButton.setChecked(False)
+        self.logTable.horizontalHeader().setSortIndicator(
+            -1, Qt.SortOrder.AscendingOrder
+        )
+        self.logModel.setMessages([])
+        self.fieldModel.setFields(self.fields)
 
     def displayFields(self):
         """
         显示属性
         """
-        for topField in self.fields:
-            # 顶级属性
-            topItem = QTreeWidgetItem([topField])
-            topItem.setFlags(topItem.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-            topItem.setCheckState(0, Qt.CheckState.Unchecked)
-            for innerField in self.fields[topField]:
-                # timestamp不创建选项
-                if innerField == "timestamp":
-                    continue
-                # 属性选项
-                innerItem = QTreeWidgetItem([innerField])
-                innerItem.setFlags(innerItem.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-                innerItem.setCheckState(0, Qt.CheckState.Unchecked)
-                topItem.addChild(innerItem)
-            self.fieldTree.addTopLevelItem(topItem)
+        self.fieldModel.setFields(self.fields)
 
     def displayLogMessage(self):
         """
         显示日志信息
         """
-        # 设置表格调整方式
-        self.logTable.horizontalHeader().setSectionResizeMode(
-            QHeaderView.ResizeMode.ResizeToContents
-        )
-        self.logTable.setRowCount(len(self.logMesasges))
-        # 设置表格内容
-        for i, message in enumerate(self.logMesasges):
-            for j in range(3):
-                self.logTable.setItem(i, j, QTableWidgetItem(message[j]))
+        self.logModel.setMessages(self.logMesasges)
 
     def toggleEchartTheme(self, isDark: bool):
         """
         切换echart主题
         """
+        if self.useNativeChart:
+            self.chartWidget.setDarkTheme(isDark)
+            return
         if isDark:
             theme = "dark"
         else:
@@ -706,50 +1204,357 @@ class MainInterface(CardWidget):
             """
         )
 
+    def loadTopics(self, topics: list, callback=None):
+        """
+        描述:
+            按需加载模式下,在子进程中解码指定topic的数据
+
+        参数:
+            topics (list): 需要加载的topic的label列表
+            callback (Callable, optional): 加载完成后调用的函数,默认重新画图
+        """
+        callback = callback or self.drawChart
+        if self.loadThread.isRunning():
+            # 不能同时运行两个加载线程,排队等待当前加载完成后再检查
+            self.loadQueue.append(lambda: self.loadTopics(topics, callback))
+            return
+        # 排队期间可能已经被其他请求加载
+        topics = [topField for topField in topics if not self.fields[topField].loaded]
+        if len(topics) == 0:
+            callback()
+            return
+        # 同名topic的所有实例一起加载
+        names = list(dict.fromkeys(self.fields[topField].name for topField in topics))
+        self.loadThread = LoadThread(
+            fileList=self.fileList,
+            function=load_ulog_topics,
+            args=(names,),
+            parent=self.window(),
+        )
+        self.loadThread.loadStarted.connect(self.onLoadStarted)
+        self.loadThread.fileLoaded.connect(self.onFileLoaded)
+        self.loadThread.loadFinished.connect(
+            lambda results: self.onTopicsLoaded(topics, results, callback)
+        )
+        self.loadThread.loadCanceled.connect(self.onLoadCanceled)
+        self.loadThread.loadFailed.connect(self.onLoadFailed)
+        self.loadThread.start()
+
+    def onTopicsLoaded(self, topics: list, results: list, callback):
+        """
+        描述:
+            按需加载的topic解码完成,将数据填入属性索引
+
+        参数:
+            topics (list): 请求加载的topic的label列表
+            results (list): 按文件顺序排列的load_ulog_topics结果
+            callback (Callable): 数据填入后调用的函数
+        """
+        self.onLoadStopped()
+        files = ",".join(map(os.path.basename, self.fileList))
+        self.statusWidget.setText(f"当前打开文件:{files}")
+        loaded = merge_topic_stores(results)
+        # 同名topic的所有实例一起加载,索引中没有的实例(实例序号不连续)在加载后加入
+        names = {self.fields[topField].name for topField in topics}
+        added = [key for key in loaded.topics if key not in self.fields.topics]
+        for key in added:
+            self.fields.add(Topic(*key))
+        for key, topic in self.fields.topics.items():
+            if key[0] not in names:
+                continue
+            source = loaded.topics.get(key)
+            if source is None:
+                # 只有订阅而没有任何数据的topic按空数组处理,避免重复加载
+                topic.timestamp = np.empty(0, dtype=np.uint64)
+            else:
+                topic.timestamp = source.timestamp
+                for innerField, column in source.columns.items():
+                    if innerField not in topic.columns:
+                        topic.add_column(innerField, column.type)
+            for innerField, column in topic.columns.items():
+                self.lodPyramids.pop((topic.label, innerField), None)
+                if source is not None and innerField in source.columns:
+                    column.values = source.columns[innerField].values
+                else:
+                    # 缺失的属性用单精度NaN占位
+                    column.values = np.full(
+                        len(topic.timestamp), np.nan, dtype=np.float32
+                    )
+        if len(added) > 0:
+            # 重建属性树并保持勾选状态
+            self.fields = self.fields.sorted()
+            checkedFields = defaultdict(list)
+            for topField, innerField in self.fieldModel.getCheckedFields():
+                checkedFields[topField].append(innerField)
+            self.fieldModel.setFields(self.fields)
+            self.fieldModel.setCheckedFields(checkedFields)
+            self.fieldProxy.setFilterText(self.searchEdit.text())
+        callback()
+        self.runLoadQueue()
+
+    def runLoadQueue(self):
+        """
+        依次执行排队的按需加载请求,遇到需要启动新加载的请求时停止,剩余的请求等待其完成
+        """
+        while len(self.loadQueue) > 0 and not self.loadThread.isRunning():
+            self.loadQueue.pop(0)()
+
+    def loadCheckedTopics(self, callback) -> bool:
+        """
+        描述:
+            按需加载模式下加载被勾选但还没有数据的topic
+
+        参数:
+            callback (Callable): 加载完成后调用的函数
+
+        返回值:
+            bool: 是否需要等待加载,正在加载时同样返回True
+        """
+        if hasattr(self, "loadThread") and self.loadThread.isRunning():
+            # 正在加载数据,当前加载完成后重新检查并画图
+            self.loadQueue.append(
+                lambda: self.loadCheckedTopics(callback) or callback()
+            )
+            return True
+        unloadedTopics = [
+            topField
+            for topField in dict.fromkeys(
+                topField for topField, _ in self.fieldModel.getCheckedFields()
+            )
+            if not self.fields[topField].loaded
+        ]
+        if len(unloadedTopics) > 0:
+            self.loadTopics(unloadedTopics, callback)
+            return True
+        return False
+
     def drawChart(self):
+        """
+        描述:
+            完整重绘图像,图表配置和所有series一起发送,缩放会被重置
+        """
         if not self.canDraw:
             return
-        # 清除图像
-        self.htmlWidget.page().runJavaScript("myChart.clear()")
+        if self.loadCheckedTopics(self.drawChart):
+            return
+        if self.useNativeChart:
+            self.drawNativeChart(reset=True)
+            return
+        # 正在计算的缩放结果已经过期
+        self.chartGeneration += 1
+        self.zoomThread.invalidate(self.chartGeneration)
+        self.chartViewport = self.zoomViewport = FULL_VIEWPORT
+        self.onChartViewportChanged()
+        checkedSeries = self.getCheckedSeries()
+        self.chartSeries = self.getSeriesState(checkedSeries)
+        self.chartPointNums = self.getPointNums(len(checkedSeries))
         # 获取options
-        options = self.getOptions()
+        options = self.getOptions(checkedSeries)
         if len(options["series"]) == 0:
+            # 清除图像
+            self.htmlWidget.page().runJavaScript("myChart.clear()")
             return
-        # 绘图
-        self.htmlWidget.page().runJavaScript(
-            f"""
-            options = eval({options})
-            options.tooltip.formatter = eval(options.tooltip.formatter)
-            options.xAxis.axisLabel.formatter = eval(options.xAxis.axisLabel.formatter)
-            myChart.setOption(options);
-            """
-        )
+        # 绘图,页面端清除原图像并解码数据
+        self.echartHandler.optionsChanged.emit(json.dumps(options))
         self.canDraw = True
 
-    def getOptions(self) -> dict:
+    def updateChart(self):
+        """
+        描述:
+            增量更新图像,只计算新增的series,缩放、偏移改变了的series只发送变换,
+            变换使可见点跨过可视区域上下边界的series重新计算,
+            其余series只发送id,由echart按id合并,被取消勾选的series会被删除
+        """
+        if not self.canDraw:
+            return
+        if self.useNativeChart:
+            if not self.loadCheckedTopics(self.updateChart):
+                self.drawNativeChart(reset=False)
+            return
+        if len(self.chartSeries) == 0:
+            # 页面上还没有图像
+            self.drawChart()
+            return
+        if self.loadCheckedTopics(self.updateChart):
+            return
+        # 正在计算的缩放结果基于旧的属性,已经过期
+        self.chartGeneration += 1
+        self.zoomThread.invalidate(self.chartGeneration)
+        checkedSeries = self.getCheckedSeries()
+        if len(checkedSeries) == 0:
+            # 清除图像
+            self.chartSeries = {}
+            self.htmlWidget.page().runJavaScript("myChart.clear()")
+            return
+        seriesState = self.getSeriesState(checkedSeries)
+        # 新增的series需要计算数据,series数量改变了采样点数时全部重新计算
+        pointNums = self.getPointNums(len(checkedSeries))
+        if pointNums != self.chartPointNums:
+            self.chartSeries = {}
+            self.chartPointNums = pointNums
+        for item, seriesId in zip(checkedSeries, seriesState):
+            transform = self.chartSeries.get(seriesId)
+            if (
+                transform is not None
+                and transform != seriesState[seriesId]
+                and self.transformCrossesViewport(item, transform)
+            ):
+                del self.chartSeries[seriesId]
+        series = self.seriesPreprocessing(
+            *self.chartViewport,
+            checkedSeries=[
+                item
+                for item, seriesId in zip(checkedSeries, seriesState)
+                if seriesId not in self.chartSeries
+            ],
+            pointNums=pointNums,
+            pool=self.getSeriesPool(),
+        )
+        # 缩放、偏移改变了的series只发送变换,由页面端使用已有的数据重新计算
+        transformedIds = [
+            seriesId
+            for seriesId, (zoom, offset) in seriesState.items()
+            if seriesId in self.chartSeries
+            and self.chartSeries[seriesId] != (zoom, offset)
+        ]
+        series += [
+            {
+                "id": seriesId,
+                "transform": {
+                    "zoom": seriesState[seriesId][0],
+                    "offset": seriesState[seriesId][1],
+                },
+            }
+            for seriesId in transformedIds
+        ]
+        self.mergeSeries(checkedSeries, series)
+        if self.zoomViewport != self.chartViewport:
+            # 被取消的缩放请求重新计算
+            self.zoomDrawChart(*self.zoomViewport)
+
+    def transformCrossesViewport(self, item: tuple, transform: tuple) -> bool:
+        """
+        描述:
+            判断页面上的数据从transform变换为item中的缩放、偏移后,
+            可见点是否跨过可视区域的上下边界。y轴方向按变换后的值分区采样,
+            可见点变换前后都完全在同一个区域内时分区不变,只发送变换即可
+
+        参数:
+            item (tuple): getCheckedSeries快照中的一项
+            transform (tuple): 页面上的数据采样时使用的(缩放,偏移)
+
+        返回值:
+            bool: 是否需要重新采样
+        """
+        _, _, times, _, zoom, offset, lodPyramid = item
+        if lodPyramid is None:
+            # 不采样时所有点都会发送,与分区无关
+            return False
+        xs, xe, ys, ye = self.chartViewport
+        # 与downsampleSeries相同的可见范围
+        start = max(searchTime(times, xs, "left") - 1, 0)
+        end = min(searchTime(times, xe, "right") + 1, len(times))
+        valueRange = lodPyramid.valueRange(start, end)
+        if valueRange is None:
+            return False
+        regions = set()
+        for z, o in (transform, (zoom, offset)):
+            low, high = sorted(float(value) * z + o for value in valueRange)
+            if ys < low and high < ye:
+                regions.add("inside")
+            elif ye < low:
+                regions.add("top")
+            elif high < ys:
+                regions.add("bottom")
+            else:
+                # 可见点分布在边界两侧
+                return True
+        return len(regions) > 1
+
+    def drawNativeChart(self, reset: bool):
+        """
+        描述:
+            使用原生绘图控件绘制,控件直接读取数组,缩放和平移由控件自身处理
+
+        参数:
+            reset (bool): 是否恢复为显示全部数据
+        """
+        self.chartWidget.alignMethod = appConfig.get(appConfig.alignMethod)
+        self.chartWidget.pointBudget = (
+            int(appConfig.get(appConfig.chartPointBudget))
+            if appConfig.get(appConfig.adaptivePointNum)
+            else 0
+        )
+        self.chartWidget.setSeries(
+            self.getCheckedSeries(useLod=True),
+            self.viewSelectBox.currentIndex(),
+            appConfig.get(appConfig.chartType),
+            reset,
+        )
+
+    def getSeriesState(self, checkedSeries: list) -> dict:
+        """
+        描述:
+            获取series的id和决定其数据的缩放、偏移
+
+        参数:
+            checkedSeries (list): getCheckedSeries的快照
+
+        返回值:
+            dict: {id: (缩放,偏移)}
+        """
+        return {
+            f"{topField}.{innerField}": (zoom, offset)
+            for topField, innerField, _, _, zoom, offset, _ in checkedSeries
+        }
+
+    def mergeSeries(self, checkedSeries: list, series: list, options: dict = None):
+        """
+        描述:
+            将重新计算的series与页面上已有的series按id合并后发送,
+            没有重新计算的series只发送id,不在checkedSeries中的series会被删除
+
+        参数:
+            checkedSeries (list): getCheckedSeries的快照,决定series的顺序
+            series (list): 重新计算的series
+            options (dict, optional): 一起发送的其他配置,如dataZoom
+        """
+        self.chartSeries = self.getSeriesState(checkedSeries)
+        changed = {item["id"]: item for item in series}
+        options = dict(options or {})
+        options["legend"] = {"data": list(self.chartSeries)}
+        options["series"] = [
+            changed.get(seriesId, {"id": seriesId}) for seriesId in self.chartSeries
+        ]
+        self.echartHandler.optionsMerged.emit(json.dumps(options))
+
+    def getOptions(self, checkedSeries: list = None) -> dict:
         """
         描述:
             获取echart参数配置
 
-        Returns:
-            _type_: echart配置
+        参数:
+            checkedSeries (list, optional): getCheckedSeries的快照
+
+        返回值:
+            dict: echart配置
         """
+        # tooltip和x轴标签的formatter为函数,由页面端设置
         options = {
-            "animation": "false",
+            "animation": False,
             "title": {"text": ""},
             "grid": {
                 "left": "3%",
                 "right": "4%",
                 "bottom": "3%",
-                "containLabel": "true",
+                "containLabel": True,
             },
             "tooltip": {
                 "trigger": "axis",
                 "axisPointer": {"type": "cross"},
-                "showDelay": "300",
-                "formatter": "tooltipFormatter",
+                "showDelay": 300,
             },
-            "legend": {"data": [], "animation": "false"},
+            "legend": {"data": [], "animation": False},
             "toolbox": {
                 "feature": {
                     "dataZoom": {"filterMode": "none"},
@@ -759,7 +1564,8 @@ class MainInterface(CardWidget):
                 "type": "value",
                 "max": "dataMax",
                 "axisLabel": {
-                    "formatter": f"value => ulogTimestampToTime(value, {self.viewSelectBox.currentIndex()});"
+                    # ulogTimestampToTime的时间格式
+                    "timeType": self.viewSelectBox.currentIndex()
                 },
             },
             "yAxis": {"type": "value"},
@@ -783,19 +1589,85 @@ class MainInterface(CardWidget):
             ],
             "series": [],
         }
-        series = self.seriesPreprocessing()
+        series = self.seriesPreprocessing(
+            checkedSeries=checkedSeries, pool=self.getSeriesPool()
+        )
         # 折线属性
         options["legend"]["data"] = list(map(lambda item: item["name"], series))
         options["series"] = series
         return options
 
+    def getLodPyramid(self, topField: str, innerField: str) -> LodPyramid:
+        """
+        描述:
+            获取属性的LOD金字塔,不存在时创建
+
+        参数:
+            topField (str): 顶层属性名
+            innerField (str): 属性名
+
+        返回值:
+            LodPyramid: 属性的LOD金字塔
+        """
+        key = (topField, innerField)
+        if key not in self.lodPyramids:
+            self.lodPyramids[key] = LodPyramid(
+                self.fields[topField].timestamp,
+                self.fields[topField].columns[innerField].values,
+            )
+        return self.lodPyramids[key]
+
+    def getCheckedSeries(self, useLod: bool = None) -> list:
+        """
+        描述:
+            获取被勾选且已经加载的属性的快照,只能在GUI线程中调用,
+            快照中保存数组和LOD金字塔的引用,后台线程计算时不再访问属性树和self.fields
+
+        参数:
+            useLod (bool, optional): 是否需要LOD金字塔,默认采样方式不为none时需要
+
+        返回值:
+            list: (顶层属性名,属性名,时间戳,属性值,缩放,偏移,LOD金字塔)元组列表,
+            采样方式为none时LOD金字塔为None
+        """
+        if useLod is None:
+            useLod = (
+                getSamplingMethod(appConfig.get(appConfig.chartSampling))
+                is not noneDownsampled
+            )
+        checkedSeries = []
+        for topFieldText, innerFieldText in self.fieldModel.getCheckedFields():
+            # 按需加载模式下跳过还没有数据的topic
+            topic = self.fields[topFieldText]
+            if not topic.loaded:
+                continue
+            checkedSeries.append(
+                (
+                    topFieldText,
+                    innerFieldText,
+                    topic.timestamp,
+                    topic.columns[innerFieldText].values,
+                    *self.getTransform(topFieldText, innerFieldText),
+                    (
+                        self.getLodPyramid(topFieldText, innerFieldText)
+                        if useLod
+                        else None
+                    ),
+                )
+            )
+        return checkedSeries
+
     def seriesPreprocessing(
         self,
         xs: float = -sys.float_info.max,
         xe: float = sys.float_info.max,
         ys: float = -sys.float_info.max,
         ye: float = sys.float_info.max,
-    ) -> dict:
+        checkedSeries: list = None,
+        pointNums: tuple = None,
+        pool: ThreadPoolExecutor = None,
+        canceled=None,
+    ) -> list:
         """
         描述:
             通过采样算法和要绘制的图形区域，预处理要绘制的数据
@@ -805,88 +1677,226 @@ class MainInterface(CardWidget):
             xe (float, optional): 缩放后x轴的终止值
             ys (float, optional): 缩放后y轴的起始值
             ye (float, optional): 缩放后y轴的终止值
+            checkedSeries (list, optional): getCheckedSeries的快照,默认在当前线程获取
+            pointNums (tuple, optional): 采样点数,默认按checkedSeries的数量计算
+            pool (ThreadPoolExecutor, optional): getSeriesPool获取的线程池,
+                为None时在当前线程中逐个计算。checkedSeries、pointNums和pool
+                只能在GUI线程中获取,在后台线程中调用时必须全部传入
+            canceled (Callable, optional): 返回True时中止计算
 
         返回值:
-            dict: echart中option的series项
+            list: echart中option的series项,中止时为None
         """
+        if checkedSeries is None:
+            checkedSeries = self.getCheckedSeries()
         # 获取算法
-        samplingMethod = getSamplingMethod(appConfig.get(appConfig.chartSampling))
+        sampling = appConfig.get(appConfig.chartSampling)
+        samplingMethod = getSamplingMethod(sampling)
+        # 传输属性值使用的精度,时间戳始终使用双精度
+        dtype = np.float32 if appConfig.get(appConfig.chartFloat32) else np.float64
         # 获取降采样点后的数量
-        insidePointNum = int(appConfig.get(appConfig.insidePointNum))
-        partPointNum = int(appConfig.get(appConfig.partPointNum))
-        outsidePointNum = int(appConfig.get(appConfig.outsidePointNum))
-        # 图像绘制预处理
+        if pointNums is None:
+            pointNums = self.getPointNums(len(checkedSeries))
+        viewport = (xs, xe, ys, ye)
+        viewportKey = SeriesCache.quantize(viewport)
+        # 先读取缓存,未命中的属性互不相关,放入线程池并行计算
+        keys = []
+        results = []
+        misses = []
+        for item in checkedSeries:
+            topFieldText, innerFieldText, _, values, zoom, offset, lodPyramid = item
+            # 原始数组相同且缩放、偏移、可视区域和采样设置都相同时直接使用上次的结果
+            key = (
+                topFieldText,
+                innerFieldText,
+                zoom,
+                offset,
+                viewportKey,
+                sampling,
+                pointNums,
+                lodPyramid is not None,
+                dtype,
+            )
+            keys.append(key)
+            results.append(self.seriesCache.get(key, values))
+            if results[-1] is None:
+                misses.append(len(results) - 1)
+
+        def process(item: tuple) -> dict:
+            points = self.downsampleSeries(item, viewport, samplingMethod, pointNums)
+            if dtype == np.float64:
+                return encodeArray(points)
+            # 单精度时x和y分开编码,buffer中只有x,y在"y"中
+            data = encodeArray(points[:, 0])
+            data["y"] = encodeArray(points[:, 1], dtype)
+            return data
+
+        if pool is None or len(misses) <= 1:
+            for i in misses:
+                if canceled is not None and canceled():
+                    return None
+                results[i] = process(checkedSeries[i])
+        else:
+            futures = [pool.submit(process, checkedSeries[i]) for i in misses]
+            for i, future in zip(misses, futures):
+                if canceled is not None and canceled():
+                    for pending in futures:
+                        pending.cancel()
+                    return None
+                results[i] = future.result()
+        for i in misses:
+            self.seriesCache.put(keys[i], checkedSeries[i][3], results[i])
+        logger.debug(
+            f"降采样缓存: 本次命中{len(results) - len(misses)}/{len(results)},"
+            f"累计{self.seriesCache.stats()}"
+        )
+        # 按树中的顺序组装
         series = []
-        for i in range(self.fieldTree.topLevelItemCount()):
-            topItem = self.fieldTree.topLevelItem(i)
-            for j in range(topItem.childCount()):
-                # 父选项名称
-                topFieldText = topItem.text(0)
-                # 子选项
-                innerItem = topItem.child(j)
-                # 如果属性被选中
-                if innerItem.checkState(0) == Qt.CheckState.Checked:
-                    # 获取属性
-                    innerFieldText = innerItem.text(0)
-                    data = self.fields[topFieldText][innerFieldText]
-                    # 折线属性
-                    times = self.fields[topFieldText]["timestamp"]
-                    values = data["value"]
-                    zoom, offset = data["zoom"], data["offset"]
-                    # numpy合并
-                    optionData = np.stack((times, values * zoom + offset), axis=1)
-                    # 使用布尔索引过滤数据
-                    # x轴方向条件
-                    x_condition = (optionData[:, 0] >= xs) & (optionData[:, 0] <= xe)
-                    x_left_condition = optionData[:, 0] <= xs
-                    x_right_condition = optionData[:, 0] >= xe
-                    # y轴方向条件
-                    y_condition = (optionData[:, 1] >= ys) & (optionData[:, 1] <= ye)
-                    y_top_condition = optionData[:, 1] >= ye
-                    y_bottom_condition = optionData[:, 1] <= ys
-                    # 画图区域被划为五部分、分别是左侧x_left、y_top、inside、y_bottom、x_right
-                    # 其中x_left和x_right区域完全不会显示出
-                    # y_top和y_bottom则可能存在部分点和inside部分有联系
-                    insideData = optionData[x_condition & y_condition]
-                    leftData = optionData[x_left_condition]
-                    rightData = optionData[x_right_condition]
-                    topData = optionData[x_condition & y_top_condition]
-                    bottomData = optionData[x_condition & y_bottom_condition]
-                    # 对topData、insideData、rightData采样和合并
-                    centerData = np.concatenate(
-                        (
-                            samplingMethod(topData, partPointNum),
-                            samplingMethod(insideData, insidePointNum),
-                            samplingMethod(bottomData, partPointNum),
-                        ),
-                        axis=0,
-                    )
-                    # 按时间排序
-                    centerData = centerData[np.argsort(centerData[:, 0])]
-                    # 完全合并
-                    optionData = np.concatenate(
-                        (
-                            samplingMethod(leftData, outsidePointNum),
-                            centerData,
-                            samplingMethod(rightData, outsidePointNum),
-                        ),
-                        axis=0,
-                    ).tolist()
-                    series.append(
-                        {
-                            "name": f"{topFieldText}.{innerFieldText}",
-                            "type": appConfig.get(appConfig.chartType),
-                            "data": optionData,
-                            # 点大小
-                            "symbolSize": 2,
-                            # 关闭动画
-                            "animation": "false",
-                            # 大数据优化,对type为line不生效
-                            "large": "true",
-                        }
-                    )
+        for item, data in zip(checkedSeries, results):
+            topFieldText, innerFieldText, _, _, zoom, offset, _ = item
+            series.append(
+                {
+                    # id用于页面端增量合并
+                    "id": f"{topFieldText}.{innerFieldText}",
+                    "name": f"{topFieldText}.{innerFieldText}",
+                    "type": appConfig.get(appConfig.chartType),
+                    # 按[x,y,x,y...]展开的二进制数据,页面端解码为Float64Array,
+                    # 单精度时y单独以float32编码
+                    "data": data,
+                    "transform": {"zoom": zoom, "offset": offset},
+                    "dimensions": ["x", "y"],
+                    # 点大小
+                    "symbolSize": 2,
+                    # 关闭动画
+                    "animation": False,
+                    # 大数据优化,对type为line不生效
+                    "large": True,
+                }
+            )
         return series
 
+    def getPointNums(self, seriesCount: int) -> tuple:
+        """
+        描述:
+            获取每个series的采样点数,开启自动计算且页面已报告绘图区域宽度时按像素宽度计算,
+            否则使用设置中的固定数量
+
+        参数:
+            seriesCount (int): 绘制的series数量
+
+        返回值:
+            tuple: (可视区,部分可视区,完全不可视区)的采样点数
+        """
+        if appConfig.get(appConfig.adaptivePointNum) and self.plotWidth > 0:
+            return adaptivePointNums(
+                self.plotWidth,
+                seriesCount,
+                appConfig.get(appConfig.chartType),
+                int(appConfig.get(appConfig.chartPointBudget)),
+            )
+        return (
+            int(appConfig.get(appConfig.insidePointNum)),
+            int(appConfig.get(appConfig.partPointNum)),
+            int(appConfig.get(appConfig.outsidePointNum)),
+        )
+
+    def getSeriesPool(self):
+        """
+        描述:
+            获取预处理使用的线程池,线程数设置改变时重新创建,只能在GUI线程中调用,
+            后台线程使用请求中传入的线程池。旧的线程池在正在使用它的绘制完成后自动回收
+
+        返回值:
+            ThreadPoolExecutor: 线程池,线程数为1时返回None
+        """
+        workers = int(appConfig.get(appConfig.chartWorkers)) or os.cpu_count() or 1
+        if workers <= 1:
+            return None
+        # 线程数和线程池一起保存
+        if self.seriesPool is None or self.seriesPool[0] != workers:
+            self.seriesPool = (
+                workers,
+                ThreadPoolExecutor(workers, thread_name_prefix="series"),
+            )
+        return self.seriesPool[1]
+
+    def downsampleSeries(
+        self, item: tuple, viewport: tuple, samplingMethod, pointNums: tuple
+    ) -> np.ndarray:
+        """
+        描述:
+            对单个属性按可视区域分区采样,只有LOD缩减后的切片转换为float64,
+            原始数组保持ulog中的类型
+
+        参数:
+            item (tuple): getCheckedSeries快照中的一项
+            viewport (tuple): 可视区域(xs,xe,ys,ye)
+            samplingMethod (Callable): 采样算法
+            pointNums (tuple): (可视区,部分可视区,完全不可视区)的采样点数
+
+        返回值:
+            np.ndarray: 按时间排序的[[x,y],[x,y]...]原始值数组
+        """
+        _, _, times, values, zoom, offset, lodPyramid = item
+        xs, xe, ys, ye = viewport
+        insidePointNum, partPointNum, outsidePointNum = pointNums
+        # x轴方向通过二分查找确定可见范围(时间戳有序),
+        # 两侧各多保留一个相邻点,使折线与可见区域外的点相连
+        start = max(searchTime(times, xs, "left") - 1, 0)
+        end = min(searchTime(times, xe, "right") + 1, len(times))
+        if samplingMethod is noneDownsampled or lodPyramid is None:
+            parts = (slice(0, start), slice(start, end), slice(end, None))
+        else:
+            # 先通过LOD金字塔将各区域缩减到与采样点数同一数量级
+            parts = lodPyramid.reduce(
+                start,
+                end,
+                LOD_POINT_FACTOR * insidePointNum,
+                LOD_POINT_FACTOR * outsidePointNum,
+            )
+        # 数据保持原始值,缩放和偏移由页面端作用
+        leftData, visibleData, rightData = (
+            np.stack(
+                (times[part].astype(np.float64), values[part].astype(np.float64)),
+                axis=1,
+            )
+            for part in parts
+        )
+        # 画图区域被划为五部分、分别是左侧x_left、y_top、inside、y_bottom、x_right
+        # 其中x_left和x_right区域完全不会显示出
+        # y_top和y_bottom则可能存在部分点和inside部分有联系
+        # y轴方向的划分只在可见切片上进行,按变换后的值划分
+        visibleValues = visibleData[:, 1] * zoom + offset
+        insideData = visibleData[(visibleValues >= ys) & (visibleValues <= ye)]
+        topData = visibleData[visibleValues >= ye]
+        bottomData = visibleData[visibleValues <= ys]
+        # 缩放为负数时图像上下翻转,最小值和最大值采样互换
+        partMethod = samplingMethod
+        if zoom < 0 and samplingMethod is minDownsampled:
+            partMethod = maxDownsampled
+        elif zoom < 0 and samplingMethod is maxDownsampled:
+            partMethod = minDownsampled
+        # 对topData、insideData、rightData采样和合并
+        centerData = np.concatenate(
+            (
+                partMethod(topData, partPointNum),
+                partMethod(insideData, insidePointNum),
+                partMethod(bottomData, partPointNum),
+            ),
+            axis=0,
+        )
+        # 按时间排序
+        centerData = centerData[np.argsort(centerData[:, 0], kind="stable")]
+        # 完全合并
+        return np.concatenate(
+            (
+                partMethod(leftData, outsidePointNum),
+                centerData,
+                partMethod(rightData, outsidePointNum),
+            ),
+            axis=0,
+        )
+
     def zoomDrawChart(
         self,
         xs: float = -sys.float_info.max,
@@ -896,7 +1906,7 @@ class MainInterface(CardWidget):
     ):
         """
         描述:
-            缩放后重绘echart图像
+            缩放后重绘echart图像,数据在后台线程中计算,连续缩放时只保留最新的请求
 
         参数:
             xs (float): 缩放后x轴的起始值
@@ -904,18 +1914,80 @@ class MainInterface(CardWidget):
             ys (float): 缩放后y轴的起始值
             ye (float): 缩放后y轴的终止值
         """
-        series = self.seriesPreprocessing(xs, xe, ys, ye)
+        self.chartGeneration += 1
+        self.zoomViewport = (xs, xe, ys, ye)
+        self.onChartViewportChanged()
+        # 快照、采样点数和线程池都在GUI线程中获取,后台线程只读取它们
+        checkedSeries = self.getCheckedSeries()
+        self.zoomThread.submit(
+            self.chartGeneration,
+            (
+                xs,
+                xe,
+                ys,
+                ye,
+                checkedSeries,
+                self.getPointNums(len(checkedSeries)),
+                self.getSeriesPool(),
+            ),
+        )
+
+    @debounce(200)
+    def onPlotResized(self, width: float):
+        """
+        描述:
+            页面大小改变后更新绘图区域宽度,采样点数改变时按当前缩放范围重新计算
+
+        参数:
+            width (float): 绘图区域的宽度(物理像素)
+        """
+        self.plotWidth = width
+        if len(self.chartSeries) == 0:
+            return
+        if self.getPointNums(len(self.chartSeries)) != self.chartPointNums:
+            self.zoomDrawChart(*self.zoomViewport)
+
+    def onZoomSeriesReady(self, generation: int, args: tuple, series: list):
+        """
+        描述:
+            后台线程计算完成,只有最新请求的结果会被画出
+
+        参数:
+            generation (int): 请求编号
+            args (tuple): 请求的参数(xs,xe,ys,ye,checkedSeries,pointNums,pool)
+            series (list): echart中option的series项
+        """
+        if generation != self.chartGeneration:
+            return
+        xs, xe, ys, ye, checkedSeries, pointNums, _ = args
+        self.chartViewport = (xs, xe, ys, ye)
+        self.chartPointNums = pointNums
         # 对insideX和insideY设置缩放后的起始值和终止值
-        options = {
-            "dataZoom": [
-                {"id": "insideX", "startValue": xs, "endValue": xe},
-                {"id": "insideY", "startValue": ys, "endValue": ye},
-            ],
-            "series": series,
-        }
-        # 画图
-        self.htmlWidget.page().runJavaScript(
-            f"""
-            myChart.setOption(eval({options}))
-            """
+        self.mergeSeries(
+            checkedSeries,
+            series,
+            {
+                "dataZoom": [
+                    {"id": "insideX", "startValue": xs, "endValue": xe},
+                    {"id": "insideY", "startValue": ys, "endValue": ye},
+                ]
+            },
+        )
+
+    def onZoomSeriesFailed(self, generation: int, error: str):
+        """
+        描述:
+            后台线程计算失败,只提示最新请求的错误
+
+        参数:
+            generation (int): 请求编号
+            error (str): 错误信息
+        """
+        if generation != self.chartGeneration:
+            return
+        InfoBar.error(
+            title="错误",
+            content=f"缩放重绘失败:{error}",
+            duration=5000,
+            parent=self,
         )
@@ -1,6 +1,7 @@
 from qfluentwidgets import (
     PrimaryPushSettingCard,
     ComboBoxSettingCard,
+    SwitchSettingCard,
     SmoothScrollArea,
     SettingCardGroup,
     HyperlinkCard,
@@ -18,6 +19,7 @@ import http.client
 from urllib.parse import urlparse
 from src.gui.components import InputSettingCard
 from src.common import SOFTWARE_COPYRIGHT, appConfig
+from src.utils import UlogCache
 
 
 class GetVersionThread(QThread):
@@ -92,6 +94,45 @@ class SettingInterface(SmoothScrollArea):
             appConfig.get(appConfig.fieldsConfig),
             self.softGroup,
         )
+        self.exportWorkersCard = InputSettingCard(
+            configItem=appConfig.exportWorkers,
+            regStr=r"^\d+$",
+            icon=Icons.IOT,
+            title="导出进程数",
+            content="导出时并行写入不同topic的进程数量,0表示与CPU核数相同",
+            parent=self.softGroup,
+        )
+        self.exportFormatCard = ComboBoxSettingCard(
+            appConfig.exportFormat,
+            Icons.SAVE_AS,
+            "导出格式",
+            "csv、parquet和feather每个topic导出一个文件,npz和hdf5将所有topic导出到一个文件,二进制格式保留原始数据类型,hdf5需要安装h5py,parquet和feather需要安装pyarrow",
+            texts=["csv", "npz", "hdf5", "parquet", "feather"],
+            parent=self.softGroup,
+        )
+        self.exportCompressionCard = ComboBoxSettingCard(
+            appConfig.exportCompression,
+            Icons.ZIP_FOLDER,
+            "导出压缩方式",
+            "二进制格式的压缩方式,none不压缩,fast压缩和解压速度快,small文件更小",
+            texts=["none", "fast", "small"],
+            parent=self.softGroup,
+        )
+        self.alignMethodCard = ComboBoxSettingCard(
+            appConfig.alignMethod,
+            Icons.ALIGNMENT,
+            "时间对齐方式",
+            "对齐导出和读取图表某一时刻的属性值时,nearest取最近的点,previous取之前最后一个点,linear线性插值",
+            texts=["nearest", "previous", "linear"],
+            parent=self.softGroup,
+        )
+        self.lazyLoadCard = SwitchSettingCard(
+            Icons.SPEED_HIGH,
+            "按需加载",
+            "打开日志时只读取属性索引,勾选属性时才解析对应数据,适合打开较大的日志",
+            configItem=appConfig.lazyLoad,
+            parent=self.softGroup,
+        )
         self.chartTypeCard = ComboBoxSettingCard(
             appConfig.chartType,
             Icons.CHAT,
@@ -100,12 +141,42 @@ class SettingInterface(SmoothScrollArea):
             texts=["line", "scatter"],
             parent=self.softGroup,
         )
+        self.chartRendererCard = ComboBoxSettingCard(
+            appConfig.chartRenderer,
+            Icons.BRUSH,
+            "图表绘制方式",
+            "echarts使用内嵌浏览器绘制,native使用Qt直接绘制原始数据,占用内存更少、缩放大数据更快,重启后生效",
+            texts=["echarts", "native"],
+            parent=self.softGroup,
+        )
         self.chartSamplingCard = ComboBoxSettingCard(
             appConfig.chartSampling,
             Icons.CLIPPING_TOOL,
             "图表采样算法",
-            "选择切换echart图表采样算法,默认使用lttb算法采样,none表示不进行采样,不同采样算法能不同程度上提高echart绘图速度。",
-            texts=["lttb", "average", "min", "max", "none"],
+            "选择切换echart图表采样算法,默认使用lttb算法采样,m4算法保留每组的首尾点和最值点,none表示不进行采样,不同采样算法能不同程度上提高echart绘图速度。",
+            texts=["lttb", "m4", "average", "min", "max", "none"],
+            parent=self.softGroup,
+        )
+        self.adaptivePointNumCard = SwitchSettingCard(
+            Icons.FIT_PAGE,
+            "自动采样点数量",
+            "按图表的像素宽度计算每个属性的采样点数,宽屏显示更多细节,勾选较多属性时总点数不超过上限,关闭时使用下面的固定数量",
+            configItem=appConfig.adaptivePointNum,
+            parent=self.softGroup,
+        )
+        self.chartPointBudgetCard = InputSettingCard(
+            configItem=appConfig.chartPointBudget,
+            regStr=r"^\d+$",
+            icon=Icons.FONT_SIZE,
+            title="采样点总数上限",
+            content="自动计算采样点数量时,所有属性的采样点数之和不超过该值",
+            parent=self.softGroup,
+        )
+        self.chartFloat32Card = SwitchSettingCard(
+            Icons.SPEED_MEDIUM,
+            "单精度绘图数据",
+            "传输给图表的属性值使用float32,数据量减少四分之一,时间戳仍使用float64不损失精度,属性值只保留约7位有效数字,超过2^24的整数会损失精度",
+            configItem=appConfig.chartFloat32,
             parent=self.softGroup,
         )
         self.insidePointNumCard = InputSettingCard(
@@ -132,14 +203,68 @@ class SettingInterface(SmoothScrollArea):
             content="数据量超过阈值时则将使用采样算法,完全不可视区域将降低到的采样点数量",
             parent=self.softGroup,
         )
+        self.chartWorkersCard = InputSettingCard(
+            configItem=appConfig.chartWorkers,
+            regStr=r"^\d+$",
+            icon=Icons.IOT,
+            title="绘图线程数",
+            content="并行降采样不同属性的线程数量,0表示与CPU核数相同",
+            parent=self.softGroup,
+        )
         # 添加进SettingCardGroup中
         self.softGroup.addSettingCard(self.importDirCard)
+        self.softGroup.addSettingCard(self.exportWorkersCard)
+        self.softGroup.addSettingCard(self.exportFormatCard)
+        self.softGroup.addSettingCard(self.exportCompressionCard)
+        self.softGroup.addSettingCard(self.alignMethodCard)
         self.softGroup.addSettingCard(self.ulogFieldsConfigCard)
+        self.softGroup.addSettingCard(self.lazyLoadCard)
         self.softGroup.addSettingCard(self.chartTypeCard)
+        self.softGroup.addSettingCard(self.chartRendererCard)
         self.softGroup.addSettingCard(self.chartSamplingCard)
+        self.softGroup.addSettingCard(self.adaptivePointNumCard)
+        self.softGroup.addSettingCard(self.chartPointBudgetCard)
+        self.softGroup.addSettingCard(self.chartFloat32Card)
         self.softGroup.addSettingCard(self.insidePointNumCard)
         self.softGroup.addSettingCard(self.partPointNumCard)
         self.softGroup.addSettingCard(self.outsidePointNumCard)
+        self.softGroup.addSettingCard(self.chartWorkersCard)
+
+    def initCacheWidget(self):
+        self.cacheGroup = SettingCardGroup("缓存", self.scrollWidget)
+        self.cacheEnabledCard = SwitchSettingCard(
+            Icons.SAVE,
+            "解析结果缓存",
+            "将解析后的日志数据缓存到磁盘,再次打开相同的日志时直接读取缓存。首次打开需要计算文件哈希并写入副本,按需加载模式下不使用缓存",
+            configItem=appConfig.cacheEnabled,
+            parent=self.cacheGroup,
+        )
+        self.cacheFolderCard = PrimaryPushSettingCard(
+            "选择文件夹",
+            Icons.FOLDER,
+            "缓存路径",
+            appConfig.get(appConfig.cacheFolder),
+            self.cacheGroup,
+        )
+        self.cacheMaxSizeCard = InputSettingCard(
+            configItem=appConfig.cacheMaxSize,
+            regStr=r"^\d+$",
+            icon=Icons.FONT_SIZE,
+            title="缓存大小上限(MB)",
+            content="缓存超过上限时将删除最久没有使用的缓存",
+            parent=self.cacheGroup,
+        )
+        self.cacheClearCard = PrimaryPushSettingCard(
+            "清空缓存",
+            Icons.DELETE,
+            "清空缓存",
+            self.getCacheSizeText(),
+            self.cacheGroup,
+        )
+        self.cacheGroup.addSettingCard(self.cacheEnabledCard)
+        self.cacheGroup.addSettingCard(self.cacheFolderCard)
+        self.cacheGroup.addSettingCard(self.cacheMaxSizeCard)
+        self.cacheGroup.addSettingCard(self.cacheClearCard)
 
     def initPersonalWidget(self):
         self.personalGroup = SettingCardGroup("个性化", self.scrollWidget)
@@ -201,12 +326,15 @@ class SettingInterface(SmoothScrollArea):
         expandLayout.setContentsMargins(36, 24, 36, 24)
         # 软件配置项
         self.initSoftWidget()
+        # 缓存项
+        self.initCacheWidget()
         # 个性化项
         self.initPersonalWidget()
         # 关于项
         self.initAboutWidget()
         # 添加配置项
         expandLayout.addWidget(self.softGroup)
+        expandLayout.addWidget(self.cacheGroup)
         expandLayout.addWidget(self.personalGroup)
         expandLayout.addWidget(self.aboutGroup)
         # 设置
@@ -229,6 +357,42 @@ class SettingInterface(SmoothScrollArea):
             # 更新ui
             self.importDirCard.setContent(dir)
 
+    def getCacheSizeText(self) -> str:
+        size = UlogCache(appConfig.get(appConfig.cacheFolder)).size()
+        return f"当前缓存占用 {size / 1024 / 1024:.1f} MB"
+
+    def setCacheDir(self):
+        """
+        设置缓存目录
+        """
+        dir = QFileDialog.getExistingDirectory(self, "选择缓存目录")
+        if dir:
+            appConfig.set(appConfig.cacheFolder, dir)
+            self.cacheFolderCard.setContent(dir)
+            self.cacheClearCard.setContent(self.getCacheSizeText())
+
+    def onExportWorkersChanged(self):
+        value = self.exportWorkersCard.inputEdit.text()
+        if value != appConfig.get(appConfig.exportWorkers):
+            appConfig.set(appConfig.exportWorkers, value)
+            InfoBar.success("提示", "参数修改成功", duration=1500, parent=self)
+
+    def onCacheMaxSizeChanged(self):
+        value = self.cacheMaxSizeCard.inputEdit.text()
+        if value != appConfig.get(appConfig.cacheMaxSize):
+            appConfig.set(appConfig.cacheMaxSize, value)
+            # 立即按新的上限淘汰缓存
+            UlogCache(
+                appConfig.get(appConfig.cacheFolder), int(value) * 1024 * 1024
+            ).evict()
+            self.cacheClearCard.setContent(self.getCacheSizeText())
+            InfoBar.success("提示", "参数修改成功", duration=1500, parent=self)
+
+    def clearCache(self):
+        UlogCache(appConfig.get(appConfig.cacheFolder)).clear()
+        self.cacheClearCard.setContent(self.getCacheSizeText())
+        InfoBar.success("提示", "缓存已清空", duration=1500, parent=self)
+
     def loadUlogConfigFile(self):
         """
         加载ulog配置参数文件,文件应该为.json
@@ -294,6 +458,13 @@ class SettingInterface(SmoothScrollArea):
             InfoBar.success("提示", "采样算法修改成功", duration=1500, parent=self)
             self.chartRedrawSignal.emit()
 
+    def onChartPointBudgetChanged(self):
+        value = self.chartPointBudgetCard.inputEdit.text()
+        if value != appConfig.get(appConfig.chartPointBudget):
+            appConfig.set(appConfig.chartPointBudget, value)
+            InfoBar.success("提示", "参数修改成功", duration=1500, parent=self)
+            self.chartRedrawSignal.emit()
+
     def onInsidePointNumChanged(self):
         value = self.insidePointNumCard.inputEdit.text()
         if value != appConfig.get(appConfig.insidePointNum):
@@ -315,6 +486,12 @@ class SettingInterface(SmoothScrollArea):
             InfoBar.success("提示", "参数修改成功", duration=1500, parent=self)
             self.chartRedrawSignal.emit()
 
+    def onChartWorkersChanged(self):
+        value = self.chartWorkersCard.inputEdit.text()
+        if value != appConfig.get(appConfig.chartWorkers):
+            appConfig.set(appConfig.chartWorkers, value)
+            InfoBar.success("提示", "参数修改成功", duration=1500, parent=self)
+
     def onBackgroundEffectCardChanged(self, option):
         self.window().applyBackgroundEffectByConfig()
 
@@ -337,11 +514,25 @@ class SettingInterface(SmoothScrollArea):
         # 软件设置
         self.importDirCard.clicked.connect(self.setImportDir)
         self.ulogFieldsConfigCard.clicked.connect(self.loadUlogConfigFile)
+        self.exportWorkersCard.inputEdit.editingFinished.connect(
+            self.onExportWorkersChanged
+        )
+        # 缓存设置
+        self.cacheFolderCard.clicked.connect(self.setCacheDir)
+        self.cacheMaxSizeCard.inputEdit.editingFinished.connect(
+            self.onCacheMaxSizeChanged
+        )
+        self.cacheClearCard.clicked.connect(self.clearCache)
         # echart图表设置
         self.chartTypeCard.comboBox.currentTextChanged.connect(self.onChartTypeChanged)
         self.chartSamplingCard.comboBox.currentTextChanged.connect(
             self.onChartSamplingChanged
         )
+        self.adaptivePointNumCard.checkedChanged.connect(self.chartRedrawSignal)
+        self.chartFloat32Card.checkedChanged.connect(self.chartRedrawSignal)
+        self.chartPointBudgetCard.inputEdit.editingFinished.connect(
+            self.onChartPointBudgetChanged
+        )
         self.insidePointNumCard.inputEdit.editingFinished.connect(
             self.onInsidePointNumChanged
         )
@@ -351,6 +542,9 @@ class SettingInterface(SmoothScrollArea):
         self.outsidePointNumCard.inputEdit.editingFinished.connect(
             self.onOutsidePointNumChanged
         )
+        self.chartWorkersCard.inputEdit.editingFinished.connect(
+            self.onChartWorkersChanged
+        )
         # 个性化
         if sys.platform == "win32":
             self.backgroundEffectCard.comboBox.currentIndexChanged.connect(
@@ -1,2 +1,7 @@
 from .common_utils import *
+from .topic_utils import *
 from .ulog_utils import *
+from .cache_utils import *
+from .lod_utils import *
+from .export_utils import *
+from .align_utils import *
@@ -0,0 +1,148 @@
+import numpy as np
+from .lod_utils import searchTime
+from .topic_utils import Topic, TopicStore
+
+# 对齐方式:最近的点、之前最后一个点、线性插值
+ALIGN_METHODS = ["nearest", "previous", "linear"]
+
+
+def make_time_grid(start: float, end: float, rate: float) -> np.ndarray:
+    """
+    描述:
+        生成固定频率的时间网格
+
+    参数:
+        start (float): 起始时间戳(微秒)
+        end (float): 终止时间戳(微秒,包含)
+        rate (float): 频率(Hz)
+
+    返回值:
+        np.ndarray: uint64时间戳
+    """
+    period = 1e6 / rate
+    count = max(int(np.floor((end - start) / period)) + 1, 0)
+    return np.round(start + np.arange(count) * period).astype(np.uint64)
+
+
+def reference_time_grid(times: np.ndarray, start=None, end=None) -> np.ndarray:
+    """
+    描述:
+        使用参考topic在[start, end]内的时间戳作为时间网格
+
+    参数:
+        times (np.ndarray): 参考topic的时间戳
+        start (float, optional): 起始时间戳,None表示从头开始
+        end (float, optional): 终止时间戳,None表示到结尾
+
+    返回值:
+        np.ndarray: 参考时间戳的视图
+    """
+    first = 0 if start is None else searchTime(times, start, "left")
+    last = len(times) if end is None else searchTime(times, end, "right")
+    return times[first : max(first, last)]
+
+
+def _previous_index(times: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """
+    描述:
+        查找每个网格时间之前(包含相等)最后一个点的位置,没有时为-1
+
+    参数:
+        times (np.ndarray): 单调递增的时间戳
+        grid (np.ndarray): 网格时间
+
+    返回值:
+        np.ndarray: 位置数组
+    """
+    if times.dtype.kind in "iu" and grid.dtype.kind == "f":
+        # 与searchTime相同,转换为整数后查找,避免将整个时间戳数组转换为float64
+        info = np.iinfo(times.dtype)
+        keys = np.clip(np.floor(grid), info.min, info.max).astype(times.dtype)
+        index = np.searchsorted(times, keys, side="right") - 1
+        # 裁剪后小于最小值的网格时间不能匹配到等于最小值的点
+        index[grid < info.min] = -1
+        return index
+    return np.searchsorted(times, grid, side="right") - 1
+
+
+def align_column(
+    times: np.ndarray, values: np.ndarray, grid: np.ndarray, method: str = "nearest"
+) -> np.ndarray:
+    """
+    描述:
+        将一列数据对齐到时间网格。nearest和previous在没有缺失时保持原始类型,
+        linear和存在缺失时为float64,缺失处为NaN。
+        只对网格查找位置,代价与网格长度成正比,与数据总长度无关
+
+    参数:
+        times (np.ndarray): 单调递增的时间戳
+        values (np.ndarray): 属性值
+        grid (np.ndarray): 网格时间
+        method (str, optional): nearest、previous或linear
+
+    返回值:
+        np.ndarray: 与grid等长的属性值
+    """
+    grid = np.asarray(grid)
+    n = len(times)
+    if n == 0:
+        return np.full(len(grid), np.nan)
+    index = _previous_index(times, grid)
+    after = np.minimum(index + 1, n - 1)
+    before = np.maximum(index, 0)
+    if method == "nearest":
+        # 选择左右两侧更近的点,网格在首点之前时使用首点
+        gridTimes = grid.astype(np.float64)
+        useAfter = (index < 0) | (
+            (index + 1 < n) & (times[after] - gridTimes < gridTimes - times[before])
+        )
+        return values[np.where(useAfter, after, before)]
+    if method == "previous":
+        result = values[before]
+        missing = index < 0
+    elif method == "linear":
+        t0 = times[before].astype(np.float64)
+        t1 = times[after].astype(np.float64)
+        v0 = values[before].astype(np.float64)
+        v1 = values[after].astype(np.float64)
+        span = t1 - t0
+        # 与点重合或时间戳相同时直接使用之前的点
+        ratio = np.divide(grid - t0, span, out=np.zeros_like(span), where=span > 0)
+        result = v0 + (v1 - v0) * ratio
+        missing = (index < 0) | (grid > times[-1])
+    else:
+        raise ValueError(f"不支持的对齐方式:{method}")
+    if missing.any():
+        result = result.astype(np.float64)
+        result[missing] = np.nan
+    return result
+
+
+def align_fields(
+    fields: TopicStore, grid: np.ndarray, method: str = "nearest", name="aligned"
+) -> Topic:
+    """
+    描述:
+        将多个topic的属性对齐到同一个时间网格,合并为一张宽表
+
+    参数:
+        fields (TopicStore): 对齐的topic,可以只包含部分属性
+        grid (np.ndarray): 网格时间
+        method (str, optional): nearest、previous或linear
+        name (str, optional): 结果的topic名称
+
+    返回值:
+        Topic: timestamp为网格时间,列名为"topic的label.属性名"
+    """
+    aligned = Topic(name, 0, grid)
+    for topField, topic in fields.items():
+        for field_name, column in topic.columns.items():
+            values = align_column(topic.timestamp, column.values, grid, method)
+            # 插值或存在缺失时类型变为double
+            sameType = values.dtype == column.values.dtype
+            aligned.add_column(
+                f"{topField}.{field_name}",
+                column.type if sameType else "double",
+                values,
+            )
+    return aligned
@@ -0,0 +1,307 @@
+from .ulog_utils import load_ulog
+from .topic_utils import Topic, TopicStore
+import numpy as np
+import os, json, math, shutil, hashlib, threading
+from collections import OrderedDict
+
+# 缓存格式版本,格式改变时需要增加,旧版本的缓存会被视为未命中
+CACHE_VERSION = 2
+
+
+def get_cache_key(filepath: str) -> str:
+    """
+    描述:
+        根据文件内容的哈希和文件大小生成缓存键
+
+    参数:
+        filepath (str): ulog文件路径
+
+    返回值:
+        str: 缓存键
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, "rb") as file:
+        while chunk := file.read(1 << 20):
+            digest.update(chunk)
+    return f"{digest.hexdigest()}_{os.path.getsize(filepath)}"
+
+
+class UlogCache:
+    """
+    描述:
+        ulog解析结果的磁盘缓存,每个文件对应缓存目录下的一个子目录:
+        meta.json保存日志信息、参数、日志消息和topic清单,
+        每个topic的timestamp和属性列分别保存为一个.npy文件,读取时以内存映射方式打开
+    """
+
+    def __init__(self, folder: str, max_size: int = 0):
+        """
+        参数:
+            folder (str): 缓存目录
+            max_size (int, optional): 缓存大小上限(字节),超过时按最近最少使用淘汰
+        """
+        self.folder = folder
+        self.max_size = max_size
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.folder, key)
+
+    def contains(self, key: str) -> bool:
+        meta = os.path.join(self._entry(key), "meta.json")
+        if not os.path.exists(meta):
+            return False
+        with open(meta, "r", encoding="utf-8") as file:
+            return json.load(file).get("version") == CACHE_VERSION
+
+    def load(self, key: str) -> dict:
+        """
+        描述:
+            读取缓存,数组以只读内存映射的方式打开
+
+        参数:
+            key (str): 缓存键
+
+        返回值:
+            dict: 结构同load_ulog的返回值
+        """
+        entry = self._entry(key)
+        with open(os.path.join(entry, "meta.json"), "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        fields = TopicStore()
+        for topicMeta in meta["topics"]:
+            topic = fields.add(
+                Topic(
+                    topicMeta["name"],
+                    topicMeta["multi_id"],
+                    np.load(os.path.join(entry, topicMeta["timestamp"]), mmap_mode="r"),
+                )
+            )
+            for field_name, type_str, filename in topicMeta["fields"]:
+                topic.add_column(
+                    field_name,
+                    type_str,
+                    np.load(os.path.join(entry, filename), mmap_mode="r"),
+                )
+        # 更新访问时间,用于淘汰最近最少使用的缓存
+        os.utime(os.path.join(entry, "meta.json"))
+        return {
+            "fields": fields,
+            "logged_messages": meta["logged_messages"],
+            "initial_parameters": meta["initial_parameters"],
+            "changed_parameters": [tuple(item) for item in meta["changed_parameters"]],
+            "info": tuple(meta["info"]),
+        }
+
+    def save(self, key: str, result: dict):
+        """
+        描述:
+            将load_ulog的结果写入缓存,先写入临时目录再重命名,避免读取到不完整的缓存
+
+        参数:
+            key (str): 缓存键
+            result (dict): load_ulog的返回值,属性必须已经加载
+        """
+        entry = self._entry(key)
+        temp = f"{entry}.tmp{os.getpid()}"
+        os.makedirs(temp, exist_ok=True)
+        topics = []
+        for i, topic in enumerate(result["fields"].values()):
+            topicMeta = {
+                "name": topic.name,
+                "multi_id": topic.multi_id,
+                "timestamp": f"{i}_timestamp.npy",
+                "fields": [],
+            }
+            np.save(os.path.join(temp, topicMeta["timestamp"]), topic.timestamp)
+            for j, (field_name, column) in enumerate(topic.columns.items()):
+                filename = f"{i}_{j}.npy"
+                np.save(os.path.join(temp, filename), column.values)
+                topicMeta["fields"].append([field_name, column.type, filename])
+            topics.append(topicMeta)
+        meta = {
+            "version": CACHE_VERSION,
+            "topics": topics,
+            "logged_messages": result["logged_messages"],
+            "initial_parameters": result["initial_parameters"],
+            "changed_parameters": result["changed_parameters"],
+            "info": result["info"],
+        }
+        with open(os.path.join(temp, "meta.json"), "w", encoding="utf-8") as file:
+            json.dump(meta, file)
+        try:
+            os.rename(temp, entry)
+        except OSError:
+            # 其他进程已经写入了相同的缓存
+            shutil.rmtree(temp, ignore_errors=True)
+        self.evict(keep=entry)
+
+    def entries(self) -> list:
+        """
+        描述:
+            获取所有缓存项
+
+        返回值:
+            list: (缓存目录,大小,最近访问时间)元组列表
+        """
+        if not os.path.isdir(self.folder):
+            return []
+        entries = []
+        for name in os.listdir(self.folder):
+            entry = self._entry(name)
+            meta = os.path.join(entry, "meta.json")
+            if not os.path.exists(meta):
+                continue
+            size = sum(item.stat().st_size for item in os.scandir(entry))
+            entries.append((entry, size, os.path.getmtime(meta)))
+        return entries
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep: str = None):
+        """
+        描述:
+            按最近最少使用的顺序删除缓存,直到缓存大小不超过上限
+
+        参数:
+            keep (str, optional): 不会被删除的缓存目录,如刚写入的缓存
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for entry, size, _ in entries:
+            if total <= self.max_size:
+                break
+            if entry == keep:
+                continue
+            # 正在被内存映射的文件在Windows上无法删除,忽略错误
+            shutil.rmtree(entry, ignore_errors=True)
+            if not os.path.exists(entry):
+                total -= size
+
+    def clear(self):
+        for entry, _, _ in self.entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def load_ulog_cached(filepath: str, folder: str, max_size: int) -> dict:
+    """
+    描述:
+        带缓存的load_ulog,供进程池中的子进程调用。命中缓存或写入缓存后只返回缓存键,
+        由主进程以内存映射的方式打开,避免在进程间传输数据。
+        计算缓存键需要读取整个文件,按需加载模式下不使用缓存
+
+    参数:
+        filepath (str): ulog文件路径
+        folder (str): 缓存目录
+        max_size (int): 缓存大小上限(字节)
+
+    返回值:
+        dict: {"cache_key": 缓存键}或load_ulog的返回值
+    """
+    cache = UlogCache(folder, max_size)
+    key = get_cache_key(filepath)
+    if cache.contains(key):
+        return {"cache_key": key}
+    cache.save(key, load_ulog(filepath))
+    return {"cache_key": key}
+
+
+class SeriesCache:
+    """
+    描述:
+        降采样结果的内存LRU缓存,可以在多个线程中使用。
+        每个结果记录计算时使用的原始数组,读取时原始数组不是同一个对象(数据被重新加载)则视为未命中
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        参数:
+            max_entries (int, optional): 最多缓存的结果数量,超过时淘汰最久未使用的结果
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def quantize(viewport: tuple, precision: int = 1000) -> tuple:
+        """
+        描述:
+            将可视区域的边界对齐到跨度的约1/precision,相差不到一个像素的区域使用相同的键
+
+        参数:
+            viewport (tuple): (xs,xe,ys,ye)
+            precision (int, optional): 每个方向的划分数量
+
+        返回值:
+            tuple: 对齐后的(xs,xe,ys,ye)
+        """
+        quantized = []
+        for start, end in (viewport[:2], viewport[2:]):
+            span = end - start
+            if not math.isfinite(span) or span <= 0:
+                quantized += [start, end]
+                continue
+            step = 10 ** math.floor(math.log10(span / precision))
+            quantized += [round(start / step) * step, round(end / step) * step]
+        return tuple(quantized)
+
+    def get(self, key, source):
+        """
+        描述:
+            读取缓存结果
+
+        参数:
+            key (Hashable): 缓存键
+            source (np.ndarray): 当前的原始数组
+
+        返回值:
+            Any: 缓存的结果,未命中时为None
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] is not source:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, source, value):
+        """
+        描述:
+            写入缓存结果
+
+        参数:
+            key (Hashable): 缓存键
+            source (np.ndarray): 计算使用的原始数组
+            value (Any): 结果
+        """
+        with self.lock:
+            self.entries[key] = (source, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        描述:
+            清空缓存和命中统计,释放对原始数组的引用
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        返回值:
+            dict: {"hits": 命中次数, "misses": 未命中次数, "entries": 缓存的结果数量}
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self.entries),
+            }
@@ -1,7 +1,7 @@
 from PyQt6.QtCore import QTimer
 from functools import wraps
 import time, numpy as np
-import os, sys
+import os, sys, base64
 
 
 def debounce(wait_ms):
@@ -52,6 +52,8 @@ def getSamplingMethod(sampling: str):
             return minDownsampled
         case "max":
             return maxDownsampled
+        case "m4":
+            return m4Downsampled
         case _:
             return noneDownsampled
 
@@ -59,58 +61,117 @@ def getSamplingMethod(sampling: str):
 def lttbDownsampled(data: np.ndarray, nout: int) -> np.ndarray:
     """
     描述:
-        lttb算法的python实现
+        lttb算法的numpy实现,桶的划分和选点规则与逐点计算的实现完全一致,
+        桶之间依赖上一个选中的点因此按桶迭代,桶内的三角形面积一次性向量化计算
 
     参数:
         data (np.ndarray): 原始数组[[x,y],[x,y],[x,y]]
         nout (int): 降采样后的数据点数
 
     返回值:
-        np.ndarray: 降采样后的数据
+        np.ndarray: 降采样后的数据(连续数组)
     """
     # 小于nout和3时直接返回
     if len(data) <= nout or len(data) < 3:
         return data
+    if nout < 3:
+        # 只保留首尾两个点
+        return data[[0, -1]]
 
     n = len(data)
-    sampled = [data[0]]  # 永远包括第一个点
-
-    # 每个bucket的大小 (整数)
+    x, y = data[:, 0], data[:, 1]
+    # 每个bucket的大小 (整数), 剩余点数分配给前leftover个bucket
     bucket_size = (n - 2) // (nout - 2)
-    # 剩余点数用于调整最后几个bucket
     leftover = (n - 2) % (nout - 2)
-    current_bucket_start = 1
+    sizes = np.full(nout - 2, bucket_size, dtype=np.int64)
+    sizes[:leftover] += 1
+    bucket_ends = np.minimum(np.cumsum(sizes), n - 2)
+    bucket_starts = np.concatenate(([1], bucket_ends[:-1] + 1))
+
+    indices = np.empty(nout, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    # 复用的计算缓冲区
+    buffer = np.empty(bucket_size + 1, dtype=np.result_type(x, y, np.float64))
+    temp = np.empty_like(buffer)
+    x1, y1 = x[0], y[0]
+    for i in range(nout - 2):
+        start, end = bucket_starts[i], bucket_ends[i] + 1
+        xs, ys = x[start:end], y[start:end]
+        area, t = buffer[: end - start], temp[: end - start]
+        x3, y3 = x[end], y[end]
+        # 与逐点实现相同的运算顺序: x1*(y2-y3) + x2*(y3-y1) + x3*(y1-y2)
+        np.subtract(ys, y3, out=area)
+        np.multiply(area, x1, out=area)
+        np.multiply(xs, y3 - y1, out=t)
+        np.add(area, t, out=area)
+        np.subtract(y1, ys, out=t)
+        np.multiply(t, x3, out=t)
+        np.add(area, t, out=area)
+        np.abs(area, out=area)
+        offset = int(np.argmax(area))
+        if np.isnan(area[offset]):
+            # argmax会返回第一个NaN,而NaN面积在逐点实现中永远不会被选中
+            area[np.isnan(area)] = -1
+            offset = int(np.argmax(area))
+        index = start + offset
+        indices[i + 1] = index
+        x1, y1 = x[index], y[index]
+    return data[indices]
+
+
+def _splitGroups(n: int, nout: int) -> list:
+    """
+    描述:
+        按np.array_split的规则将n个点分为nout组,前n % nout组比其余组多一个点。
+        同样大小的组是连续的,因此可以分为至多两个规则的块,每块都能reshape为二维数组
+
+    参数:
+        n (int): 数据点数
+        nout (int): 分组数量
+
+    返回值:
+        list: (起始位置,组数,每组点数)元组列表
+    """
+    size, extra = divmod(n, nout)
+    blocks = [(0, extra, size + 1), (extra * (size + 1), nout - extra, size)]
+    return [block for block in blocks if block[1] > 0 and block[2] > 0]
+
+
+def _groupStarts(n: int, nout: int) -> np.ndarray:
+    """
+    描述:
+        按np.array_split的规则分组后每组的起始位置
 
-    for i in range(1, nout - 1):
-        # 根据剩余点数调整每个bucket的end
-        bucket_end = current_bucket_start + bucket_size - 1
-        if i <= leftover:
-            # 分配剩余点数
-            bucket_end += 1
+    参数:
+        n (int): 数据点数
+        nout (int): 分组数量
 
-        # 确保不越界
-        bucket_end = min(bucket_end, n - 2)
+    返回值:
+        np.ndarray: 每组的起始位置
+    """
+    return np.concatenate(
+        [start + np.arange(rows) * cols for start, rows, cols in _splitGroups(n, nout)]
+    )
 
-        max_area = -1
-        max_area_index = current_bucket_start
 
-        # 遍历bucket内的点，寻找面积最大的点
-        for j in range(current_bucket_start, bucket_end + 1):
-            # 计算三角形面积
-            x1, y1 = sampled[i - 1]
-            x2, y2 = data[j]
-            x3, y3 = data[bucket_end + 1]
-            area = abs(x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2)) * 0.5
-            if area > max_area:
-                max_area = area
-                max_area_index = j
+def _groupArg(values: np.ndarray, nout: int, argFunc) -> np.ndarray:
+    """
+    描述:
+        计算每组中argFunc(如np.argmin)选出的点在原数组中的位置
 
-        sampled.append(data[max_area_index])
-        current_bucket_start = bucket_end + 1
+    参数:
+        values (np.ndarray): 一维数据
+        nout (int): 分组数量
+        argFunc (Callable): 支持axis参数的arg函数
 
-    # 添加最后一个点
-    sampled.append(data[-1])
-    return np.array(sampled)
+    返回值:
+        np.ndarray: 每组选出的点的位置
+    """
+    indices = []
+    for start, rows, cols in _splitGroups(len(values), nout):
+        block = values[start : start + rows * cols].reshape(rows, cols)
+        indices.append(start + np.arange(rows) * cols + argFunc(block, axis=1))
+    return np.concatenate(indices)
 
 
 def averageDownsampled(data: np.ndarray, nout: int) -> np.ndarray:
@@ -128,45 +189,124 @@ def averageDownsampled(data: np.ndarray, nout: int) -> np.ndarray:
     if len(data) <= nout:
         # 如果数据点数少于或等于阈值，无需降采样
         return data
-    # 使用 np.array_split 均匀分组
-    groups = np.array_split(data, nout)
-    # 对每一组计算平均值
-    downsampledData = np.array([np.mean(group, axis=0) for group in groups])
-    return downsampledData
+    # 与np.array_split相同的分组,每个规则的块reshape后一次性求平均,
+    # 与逐组np.mean的求和顺序相同,结果完全一致
+    return np.concatenate(
+        [
+            data[start : start + rows * cols].reshape(rows, cols, -1).mean(axis=1)
+            for start, rows, cols in _splitGroups(len(data), nout)
+        ]
+    )
 
 
 def minDownsampled(data: np.ndarray, nout: int) -> np.ndarray:
     if len(data) <= nout:
         # 如果数据点数少于或等于阈值，无需降采样
         return data
-    # 使用 np.array_split 均匀分组
-    groups = np.array_split(data, nout)
-    downsampledData = []
-    for group in groups:
-        index = np.argmin(group[:, 1])
-        point = group[index]
-        downsampledData.append(point)
-    return np.array(downsampledData)
+    return data[_groupArg(data[:, 1], nout, np.argmin)]
 
 
 def maxDownsampled(data: np.ndarray, nout: int) -> np.ndarray:
     if len(data) <= nout:
         # 如果数据点数少于或等于阈值，无需降采样
         return data
-    # 使用 np.array_split 均匀分组
-    groups = np.array_split(data, nout)
-    downsampledData = []
-    for group in groups:
-        index = np.argmax(group[:, 1])
-        point = group[index]
-        downsampledData.append(point)
-    return np.array(downsampledData)
+    return data[_groupArg(data[:, 1], nout, np.argmax)]
+
+
+def m4Downsampled(data: np.ndarray, nout: int) -> np.ndarray:
+    """
+    描述:
+        m4采样算法,每组保留第一个、最后一个、最小值和最大值四个点,
+        折线图在每组对应一个像素宽度时与原始数据的绘制结果一致
+
+    参数:
+        data (np.ndarray): 原始数据
+        nout (int): 降采样后的数据点数,分组数量为nout // 4
+
+    返回值:
+        np.ndarray: 降采样后的数据
+    """
+    if len(data) <= nout:
+        # 如果数据点数少于或等于阈值，无需降采样
+        return data
+    groups = max(nout // 4, 1)
+    values = data[:, 1]
+    starts = _groupStarts(len(data), groups)
+    ends = np.append(starts[1:], len(data)) - 1
+    indices = np.stack(
+        (
+            starts,
+            _groupArg(values, groups, np.argmin),
+            _groupArg(values, groups, np.argmax),
+            ends,
+        ),
+        axis=1,
+    )
+    # 每组内按位置排序后整体即为有序,去掉同一组中重复的点
+    indices = np.sort(indices, axis=1).ravel()
+    indices = indices[np.concatenate(([True], indices[1:] != indices[:-1]))]
+    return data[indices]
 
 
 def noneDownsampled(data: np.ndarray, nout: int) -> np.ndarray:
     return data
 
 
+def adaptivePointNums(
+    plotWidth: float, seriesCount: int, chartType: str, pointBudget: int
+) -> tuple:
+    """
+    描述:
+        根据绘图区域的像素宽度计算每个series各区域的采样点数。
+        折线每个像素列保留首尾和最值点即可与原始数据画得一样,散点保留最值点,
+        所有series的总点数不超过pointBudget。
+        部分可视区和完全不可视区的点数与可视区保持默认设置的比例(1000:200:100),
+        预算充足时可视区至少100个点,每个区域至少保留首尾2个点,
+        只有每个series的预算不足32个点时总点数才可能超过pointBudget
+
+    参数:
+        plotWidth (float): 绘图区域的宽度(物理像素)
+        seriesCount (int): 绘制的series数量
+        chartType (str): line或scatter
+        pointBudget (int): 所有series的总点数上限
+
+    返回值:
+        tuple: (可视区,部分可视区,完全不可视区)的采样点数
+    """
+    pointsPerPixel = 4 if chartType == "line" else 2
+    # 每个series的点数为可视区的1.6倍(上下和左右两侧各一份)
+    budgetPerSeries = pointBudget / (1.6 * max(seriesCount, 1))
+    insidePointNum = int(min(plotWidth * pointsPerPixel, budgetPerSeries))
+    # 绘图区域很窄时的下限不能超过预算
+    insidePointNum = max(insidePointNum, min(100, int(budgetPerSeries)))
+    return (
+        max(insidePointNum, 2),
+        max(insidePointNum // 5, 2),
+        max(insidePointNum // 10, 2),
+    )
+
+
+def encodeArray(data: np.ndarray, dtype=np.float64) -> dict:
+    """
+    描述:
+        将数组编码为base64字符串,页面端解码为TypedArray后直接交给echart使用,
+        避免逐个数字转换为文本再解析
+
+    参数:
+        data (np.ndarray): 原始数组,多维数组按行展开
+        dtype (np.dtype, optional): 传输使用的类型,float64或float32
+
+    返回值:
+        dict: {"dtype": 类型名称, "buffer": base64编码后的数据}
+    """
+    # TypedArray使用小端字节序
+    data = np.ascontiguousarray(data, dtype=np.dtype(dtype).newbyteorder("<"))
+    return {
+        "dtype": data.dtype.name,
+        "buffer": base64.b64encode(data.data).decode("ascii"),
+    }
+
+
 def getResource(path):
     """
     根据系统环境，输出资源文件的最终路径
@@ -0,0 +1,338 @@
+from multiprocessing import shared_memory
+import numpy as np
+import importlib, json, zipfile
+from .lod_utils import searchTime
+from .topic_utils import Topic, TopicStore
+
+# csv每次格式化和写入的行数,决定导出时的内存占用
+CSV_CHUNK_ROWS = 65536
+# 所有topic写入同一个文件的导出格式及其扩展名
+SINGLE_FILE_FORMATS = {"npz": ".npz", "hdf5": ".h5"}
+# 每个topic写入一个文件的导出格式及其扩展名
+TOPIC_FILE_FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+# 压缩选项(none/fast/small)对应各格式的压缩方式
+EXPORT_COMPRESSIONS = {
+    "npz": {
+        "none": zipfile.ZIP_STORED,
+        "fast": zipfile.ZIP_DEFLATED,
+        "small": zipfile.ZIP_DEFLATED,
+    },
+    "hdf5": {"none": None, "fast": "lzf", "small": "gzip"},
+    "parquet": {"none": "none", "fast": "snappy", "small": "zstd"},
+    "feather": {"none": "uncompressed", "fast": "lz4", "small": "zstd"},
+}
+
+
+def format_column(column: np.ndarray) -> list:
+    """
+    描述:
+        将一列数据整体转换为字符串,结果与逐个调用str(numpy标量)一致
+
+    参数:
+        column (np.ndarray): 一列数据
+
+    返回值:
+        list: 字符串列表
+    """
+    if column.dtype == np.float64:
+        # float64转换为python float后使用相同的最短表示,比numpy逐个格式化更快
+        return list(map(repr, column.tolist()))
+    return column.astype(str).tolist()
+
+
+def get_topic_columns(topic: Topic) -> tuple:
+    """
+    描述:
+        获取topic的列名和对应的数组,timestamp在最前,其余顺序与ulog一致
+
+    参数:
+        topic (Topic): 一个topic
+
+    返回值:
+        tuple: (列名列表,数组列表)
+    """
+    names = ["timestamp", *topic.columns]
+    columns = [topic.timestamp]
+    columns += [column.values for column in topic.columns.values()]
+    return names, columns
+
+
+def select_fields(
+    fields: TopicStore, selection: dict, start=None, end=None, step: int = 1
+) -> TopicStore:
+    """
+    描述:
+        从属性字典中选出需要导出的属性,按时间范围二分查找切片并按间隔抽取,
+        结果中的数组均为原数组的视图,不会复制数据
+
+    参数:
+        fields (TopicStore): 所有topic
+        selection (dict): {topic的label: 属性名列表},没有属性的topic不导出
+        start (float, optional): 起始时间戳(包含),None表示从头开始
+        end (float, optional): 终止时间戳(包含),None表示到结尾
+        step (int, optional): 抽取间隔,每step个点保留一个
+
+    返回值:
+        TopicStore: 只包含选中属性的topic
+    """
+    selected = TopicStore()
+    for topField, names in selection.items():
+        if len(names) == 0:
+            continue
+        topic = fields[topField]
+        times = topic.timestamp
+        first = 0 if start is None else searchTime(times, start, "left")
+        last = len(times) if end is None else searchTime(times, end, "right")
+        window = slice(first, max(first, last), step)
+        part = selected.add(Topic(topic.name, topic.multi_id, times[window]))
+        for name in names:
+            column = topic.columns[name]
+            part.add_column(name, column.type, column.values[window])
+    return selected
+
+
+def get_topic_types(topic: Topic) -> dict:
+    """
+    描述:
+        获取topic中每一列在ulog中的原始类型
+
+    参数:
+        topic (Topic): 一个topic
+
+    返回值:
+        dict: {列名: 类型字符串},timestamp为uint64_t
+    """
+    types = {"timestamp": "uint64_t"}
+    types.update((name, column.type) for name, column in topic.columns.items())
+    return types
+
+
+def import_optional(module: str, feature: str):
+    """
+    描述:
+        导入可选依赖,未安装时给出需要安装的包
+
+    参数:
+        module (str): 模块名
+        feature (str): 需要该模块的功能
+
+    返回值:
+        module: 导入的模块
+    """
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        package = module.split(".")[0]
+        raise ImportError(f"{feature}需要安装{package}") from e
+
+
+def write_fields_npz(
+    filepath: str, fields: TopicStore, compression: str, progress=None
+):
+    """
+    描述:
+        将所有topic写入一个npz文件,键为"topic/列名",
+        "__types__"中保存json格式的{键: 原始类型}
+
+    参数:
+        filepath (str): npz文件路径
+        fields (TopicStore): 导出的topic,键和group名称使用topic的label
+        compression (str): none、fast或small
+        progress (Callable, optional): 每写入一个topic后调用,参数为该topic的行数
+    """
+    types = {}
+    method = EXPORT_COMPRESSIONS["npz"][compression]
+    level = 1 if compression == "fast" else None
+    with zipfile.ZipFile(
+        filepath, "w", compression=method, compresslevel=level, allowZip64=True
+    ) as npzfile:
+        for topField, topic in fields.items():
+            names, columns = get_topic_columns(topic)
+            for name, column, type_str in zip(
+                names, columns, get_topic_types(topic).values()
+            ):
+                key = f"{topField}/{name}"
+                types[key] = type_str
+                # 与np.savez相同,逐个数组写入压缩包,不需要一次性准备所有数组
+                with npzfile.open(key + ".npy", "w", force_zip64=True) as file:
+                    np.lib.format.write_array(file, np.asarray(column))
+            if progress is not None:
+                progress(len(topic.timestamp))
+        with npzfile.open("__types__.npy", "w") as file:
+            np.lib.format.write_array(file, np.array(json.dumps(types)))
+
+
+def write_fields_hdf5(
+    filepath: str, fields: TopicStore, compression: str, progress=None
+):
+    """
+    描述:
+        将所有topic写入一个hdf5文件,每个topic为一个group,
+        每列为一个dataset,原始类型保存在dataset的type属性中
+
+    参数:
+        filepath (str): hdf5文件路径
+        fields (TopicStore): 导出的topic,键和group名称使用topic的label
+        compression (str): none、fast或small
+        progress (Callable, optional): 每写入一个topic后调用,参数为该topic的行数
+    """
+    h5py = import_optional("h5py", "导出hdf5")
+    method = EXPORT_COMPRESSIONS["hdf5"][compression]
+    with h5py.File(filepath, "w") as h5file:
+        for topField, topic in fields.items():
+            group = h5file.create_group(topField)
+            names, columns = get_topic_columns(topic)
+            for name, column, type_str in zip(
+                names, columns, get_topic_types(topic).values()
+            ):
+                dataset = group.create_dataset(
+                    name,
+                    data=np.asarray(column),
+                    # 空数组不能分块压缩
+                    compression=method if len(column) > 0 else None,
+                )
+                dataset.attrs["type"] = type_str
+            if progress is not None:
+                progress(len(topic.timestamp))
+
+
+def write_topic_arrow(
+    filepath: str, topic: Topic, file_format: str, compression: str
+):
+    """
+    描述:
+        将一个topic写入parquet或feather文件,原始类型保存在每列的元数据type中
+
+    参数:
+        filepath (str): 文件路径
+        topic (Topic): 一个topic
+        file_format (str): parquet或feather
+        compression (str): none、fast或small
+    """
+    pa = import_optional("pyarrow", f"导出{file_format}")
+    names, columns = get_topic_columns(topic)
+    types = get_topic_types(topic)
+    arrays = [pa.array(np.asarray(column)) for column in columns]
+    schema = pa.schema(
+        [
+            pa.field(name, array.type, metadata={"type": types[name]})
+            for name, array in zip(names, arrays)
+        ]
+    )
+    table = pa.Table.from_arrays(arrays, schema=schema)
+    method = EXPORT_COMPRESSIONS[file_format][compression]
+    if file_format == "parquet":
+        import_optional("pyarrow.parquet", "导出parquet").write_table(
+            table, filepath, compression=method
+        )
+    else:
+        import_optional("pyarrow.feather", "导出feather").write_feather(
+            table, filepath, compression=method
+        )
+
+
+def write_csv(
+    filepath: str,
+    names: list,
+    columns: list,
+    progress=None,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    delimiter: str = ",",
+):
+    """
+    描述:
+        将等长的列写入csv文件,按块格式化整列数据后一次写入,内存占用只与块大小有关
+
+    参数:
+        filepath (str): csv文件路径
+        names (list): 列名
+        columns (list): 与列名对应的数组
+        progress (Callable, optional): 每写入一块后调用,参数为该块的行数
+        chunk_rows (int, optional): 每块的行数
+        delimiter (str, optional): 分隔符
+    """
+    rows = len(columns[0]) if len(columns) > 0 else 0
+    with open(filepath, "w", encoding="utf-8") as csvfile:
+        # 写入属性行
+        csvfile.write(delimiter.join(names) + "\n")
+        for start in range(0, rows, chunk_rows):
+            end = min(start + chunk_rows, rows)
+            cells = [format_column(column[start:end]) for column in columns]
+            # 按行拼接后整块写入
+            csvfile.write("\n".join(map(delimiter.join, zip(*cells))) + "\n")
+            if progress is not None:
+                progress(end - start)
+
+
+def write_topic_csv(filepath: str, topic: Topic, progress=None, **kwargs):
+    """
+    描述:
+        将一个topic写入csv文件
+
+    参数:
+        filepath (str): csv文件路径
+        topic (Topic): 一个topic
+        progress (Callable, optional): 同write_csv
+        **kwargs: write_csv的其他参数
+    """
+    names, columns = get_topic_columns(topic)
+    write_csv(filepath, names, columns, progress, **kwargs)
+
+
+def share_columns(columns: list) -> tuple:
+    """
+    描述:
+        将数组复制到共享内存中,子进程通过名称直接访问,不需要序列化传输。
+        共享内存由调用者负责close和unlink
+
+    参数:
+        columns (list): 数组列表
+
+    返回值:
+        tuple: (SharedMemory列表,(名称,类型,长度)描述列表)
+    """
+    blocks, descriptors = [], []
+    for column in columns:
+        # 共享内存的大小不能为0
+        block = shared_memory.SharedMemory(create=True, size=max(column.nbytes, 1))
+        np.ndarray(column.shape, dtype=column.dtype, buffer=block.buf)[:] = column
+        blocks.append(block)
+        descriptors.append((block.name, column.dtype.str, len(column)))
+    return blocks, descriptors
+
+
+def write_shared_csv(
+    filepath: str, names: list, descriptors: list, progress_queue=None, **kwargs
+):
+    """
+    描述:
+        在子进程中将共享内存中的列写入csv文件
+
+    参数:
+        filepath (str): csv文件路径
+        names (list): 列名
+        descriptors (list): share_columns返回的描述列表
+        progress_queue (Queue, optional): 每写入一块后放入该块的行数
+        **kwargs: write_csv的其他参数
+    """
+    blocks = []
+    try:
+        for name, _, _ in descriptors:
+            # spawn方式创建的子进程与主进程共用resource_tracker,由主进程负责unlink
+            blocks.append(shared_memory.SharedMemory(name=name))
+        columns = [
+            np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf)
+            for block, (_, dtype, length) in zip(blocks, descriptors)
+        ]
+        write_csv(
+            filepath,
+            names,
+            columns,
+            progress_queue.put if progress_queue is not None else None,
+            **kwargs,
+        )
+        # 释放对共享内存的引用后才能close
+        del columns
+    finally:
+        for block in blocks:
+            block.close()
@@ -0,0 +1,198 @@
+import numpy as np
+
+
+def searchTime(times: np.ndarray, value: float, side: str = "left") -> int:
+    """
+    描述:
+        在有序的时间戳中二分查找,浮点数的查找值会先转换为时间戳的整数类型,
+        避免numpy为了比较将整个时间戳数组转换为float64
+
+    参数:
+        times (np.ndarray): 单调递增的时间戳
+        value (float): 查找值
+        side (str, optional): 同np.searchsorted
+
+    返回值:
+        int: 插入位置
+    """
+    if times.dtype.kind in "iu":
+        info = np.iinfo(times.dtype)
+        # left查找第一个>=value的位置,right查找第一个>value的位置
+        value = np.ceil(value) if side == "left" else np.floor(value)
+        if value < info.min:
+            return 0
+        if value > info.max:
+            return len(times)
+        value = times.dtype.type(int(value))
+    return int(np.searchsorted(times, value, side=side))
+
+
+class LodPyramid:
+    """
+    描述:
+        单个属性的多分辨率min/max包络金字塔。第k层(k>=1)把数据按2^k个点分为一组,
+        记录每组最小值和最大值所在的位置,逐层由上一层两两合并得到,总构建代价为O(n)。
+        位置保存为组内的偏移,第k层使用能表示2^k-1的最小无符号整数类型,
+        所有层合计每个点约占2字节。
+        查询时根据可见范围的点数选择合适的层,只切片可见范围内的组,
+        因此查询代价只与返回的点数有关,与数据总长度无关
+    """
+
+    # 层数的上限,最粗的一层组数不少于该值
+    MIN_BUCKETS = 2
+
+    def __init__(self, times: np.ndarray, values: np.ndarray):
+        """
+        参数:
+            times (np.ndarray): 单调递增的时间戳
+            values (np.ndarray): 属性值,与times等长
+        """
+        self.times = times
+        self.values = values
+        self.levels = []
+        n = len(values)
+        dtype = np.int32 if n < np.iinfo(np.int32).max else np.int64
+        minIndex = maxIndex = np.arange(n, dtype=dtype)
+        # 只保留当前层的绝对位置用于计算下一层
+        while len(minIndex) > self.MIN_BUCKETS:
+            minIndex = self._pairwise(minIndex, np.less)
+            maxIndex = self._pairwise(maxIndex, np.greater)
+            level = len(self.levels) + 1
+            self.levels.append(
+                (self._compact(minIndex, level), self._compact(maxIndex, level))
+            )
+
+    @staticmethod
+    def _compact(indices: np.ndarray, level: int) -> np.ndarray:
+        """
+        描述:
+            将第level层每组极值的绝对位置转换为组内偏移
+
+        参数:
+            indices (np.ndarray): 每组极值的绝对位置
+            level (int): 层数,每组2^level个点
+
+        返回值:
+            np.ndarray: 组内偏移
+        """
+        starts = np.arange(len(indices), dtype=indices.dtype) << level
+        return (indices - starts).astype(np.min_scalar_type((1 << level) - 1))
+
+    def _pairwise(self, indices: np.ndarray, better) -> np.ndarray:
+        """
+        描述:
+            将相邻两组合并为一组,保留更小(或更大)的值所在的位置,NaN不会被保留
+
+        参数:
+            indices (np.ndarray): 上一层每组的极值位置
+            better (np.ufunc): np.less或np.greater
+
+        返回值:
+            np.ndarray: 合并后每组的极值位置
+        """
+        left, right = indices[0::2], indices[1::2]
+        # 组数为奇数时最后一组单独保留
+        merged = left.copy()
+        paired = merged[: len(right)]
+        leftValues, rightValues = self.values[paired], self.values[right]
+        useRight = better(rightValues, leftValues) | np.isnan(leftValues)
+        paired[useRight] = right[useRight]
+        return merged
+
+    def query(self, start: int, end: int, nout: int) -> np.ndarray:
+        """
+        描述:
+            获取[start, end)范围内不超过nout个包络点的位置
+
+        参数:
+            start (int): 起始位置
+            end (int): 终止位置(不包含)
+            nout (int): 点数上限
+
+        返回值:
+            np.ndarray: 按位置排序的点的位置
+        """
+        count = end - start
+        # 每组至少保留最小值和最大值两个点
+        nout = max(nout, 2)
+        if count <= nout or len(self.levels) == 0:
+            return np.arange(start, end)
+        # 第k层每组贡献两个点,选择满足点数上限的最细一层
+        level = int(np.ceil(np.log2(2 * count / nout)))
+        level = min(max(level, 1), len(self.levels))
+        minOffset, maxOffset = self.levels[level - 1]
+        first, last = start >> level, (end - 1) >> level
+        # 组内偏移加上组的起始位置
+        starts = np.arange(first, last + 1, dtype=np.int64) << level
+        indices = np.stack(
+            (
+                minOffset[first : last + 1].astype(np.int64) + starts,
+                maxOffset[first : last + 1].astype(np.int64) + starts,
+            ),
+            axis=1,
+        )
+        indices = np.sort(indices, axis=1).ravel()
+        # 边缘的组可能包含范围外的点
+        indices = indices[(indices >= start) & (indices < end)]
+        if len(indices) == 0:
+            # 极值全部落在范围外的边缘组中
+            return indices
+        return indices[np.concatenate(([True], indices[1:] != indices[:-1]))]
+
+    def valueRange(self, start: int, end: int, groupCount: int = 1024):
+        """
+        描述:
+            获取[start, end)范围内值的最小值和最大值,忽略NaN。
+            完全在范围内的组使用金字塔中记录的极值,两端不完整的组直接读取原始值,
+            代价约为groupCount加上两个组的点数
+
+        参数:
+            start (int): 起始位置
+            end (int): 终止位置(不包含)
+            groupCount (int, optional): 使用的组数量的大致上限
+
+        返回值:
+            tuple: (最小值,最大值),范围内没有有效值时为None
+        """
+        level = int(np.log2(max((end - start) / groupCount, 1)))
+        level = min(level, len(self.levels))
+        if level == 0:
+            candidates = self.values[start:end]
+        else:
+            minOffset, maxOffset = self.levels[level - 1]
+            # 完全在范围内的组为[first, last)
+            first, last = -(-start >> level), end >> level
+            starts = np.arange(first, last, dtype=np.int64) << level
+            candidates = np.concatenate(
+                (
+                    self.values[start : min(first << level, end)],
+                    self.values[minOffset[first:last].astype(np.int64) + starts],
+                    self.values[maxOffset[first:last].astype(np.int64) + starts],
+                    self.values[max(last << level, start) : end],
+                )
+            )
+        if len(candidates) == 0 or np.isnan(candidates).all():
+            return None
+        return np.nanmin(candidates), np.nanmax(candidates)
+
+    def reduce(
+        self, start: int, end: int, insidePointNum: int, outsidePointNum: int
+    ) -> tuple:
+        """
+        描述:
+            分别获取可见范围左侧、可见范围内和右侧的包络点
+
+        参数:
+            start (int): 可见范围的起始位置
+            end (int): 可见范围的终止位置(不包含)
+            insidePointNum (int): 可见范围内的点数上限
+            outsidePointNum (int): 可见范围外两侧各自的点数上限
+
+        返回值:
+            tuple: (左侧,可见范围内,右侧)三个按位置排序的位置数组
+        """
+        return (
+            self.query(0, start, outsidePointNum),
+            self.query(start, end, insidePointNum),
+            self.query(end, len(self.times), outsidePointNum),
+        )
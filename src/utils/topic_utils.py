@@ -0,0 +1,121 @@
+import numpy as np
+
+
+class Column:
+    """
+    描述:
+        topic中的一列属性,values为None表示按需加载模式下还没有加载数据
+    """
+
+    __slots__ = ("type", "values")
+
+    def __init__(self, type_str: str, values: np.ndarray = None):
+        """
+        参数:
+            type_str (str): ulog中的原始类型
+            values (np.ndarray, optional): 属性值
+        """
+        self.type = type_str
+        self.values = values
+
+
+class Topic:
+    """
+    描述:
+        ulog中一个topic实例的数据,所有列共用一个timestamp数组。
+        timestamp为None表示按需加载模式下还没有加载数据
+    """
+
+    __slots__ = ("name", "multi_id", "timestamp", "columns")
+
+    def __init__(self, name: str, multi_id: int = 0, timestamp: np.ndarray = None):
+        """
+        参数:
+            name (str): topic名称
+            multi_id (int, optional): 同名topic的实例序号
+            timestamp (np.ndarray, optional): 时间戳
+        """
+        self.name = name
+        self.multi_id = multi_id
+        self.timestamp = timestamp
+        # {属性名: Column},保持ulog中属性的顺序
+        self.columns = {}
+
+    @property
+    def key(self) -> tuple:
+        return self.name, self.multi_id
+
+    @property
+    def label(self) -> str:
+        """
+        描述:
+            界面和导出文件中使用的名称,第一个实例为topic名称,
+            其余实例与pyulog的ulog2csv相同加上"_实例序号"
+        """
+        return self.name if self.multi_id == 0 else f"{self.name}_{self.multi_id}"
+
+    @property
+    def loaded(self) -> bool:
+        return self.timestamp is not None
+
+    def add_column(self, name: str, type_str: str, values: np.ndarray = None):
+        self.columns[name] = Column(type_str, values)
+
+
+class TopicStore:
+    """
+    描述:
+        所有topic的数据,按(topic名称,实例序号)保存,同名topic的多个实例互不覆盖。
+        界面按label访问,迭代时得到label,顺序与添加的顺序相同
+    """
+
+    __slots__ = ("topics", "labels")
+
+    def __init__(self, topics=()):
+        """
+        参数:
+            topics (Iterable[Topic], optional): 初始的topic
+        """
+        # {(名称,实例序号): Topic}
+        self.topics = {}
+        # {label: (名称,实例序号)}
+        self.labels = {}
+        for topic in topics:
+            self.add(topic)
+
+    def add(self, topic: Topic) -> Topic:
+        """
+        描述:
+            添加topic,已存在相同实例时替换
+        """
+        self.topics[topic.key] = topic
+        self.labels[topic.label] = topic.key
+        return topic
+
+    def get(self, name: str, multi_id: int = 0) -> Topic:
+        return self.topics.get((name, multi_id))
+
+    def sorted(self) -> "TopicStore":
+        """
+        描述:
+            按(名称,实例序号)排序后的新TopicStore,不复制数据
+        """
+        return TopicStore(self.topics[key] for key in sorted(self.topics))
+
+    def __getitem__(self, label: str) -> Topic:
+        return self.topics[self.labels[label]]
+
+    def __contains__(self, label: str) -> bool:
+        return label in self.labels
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def items(self):
+        return ((label, self.topics[key]) for label, key in self.labels.items())
+
+    def values(self):
+        return self.topics.values()
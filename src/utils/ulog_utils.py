@@ -1,4 +1,22 @@
 from pyulog import ULog
+import numpy as np
+from .topic_utils import Topic, TopicStore
+
+# ulog中的基本类型和解析后的numpy类型,与pyulog的解析结果相同
+FIELD_TYPES = {
+    "int8_t": np.int8,
+    "uint8_t": np.uint8,
+    "int16_t": np.int16,
+    "uint16_t": np.uint16,
+    "int32_t": np.int32,
+    "uint32_t": np.uint32,
+    "int64_t": np.int64,
+    "uint64_t": np.uint64,
+    "float": np.float32,
+    "double": np.float64,
+    "bool": np.int8,
+    "char": np.int8,
+}
 
 
 def get_logged_message(ulog: ULog) -> list:
@@ -67,49 +85,278 @@ def get_change_parameters(ulog: ULog) -> list:
     return changed_parameters
 
 
-def get_fields_dict(ulog: ULog) -> dict:
+def get_topic_store(ulog: ULog) -> TopicStore:
     """
     描述:
-        获取属性字典
+        获取所有topic的数据,同名topic的每个实例单独保存
 
     参数:
         ulog (ULog): ulog文件,使用pyulog.ULog创建
 
     返回值:
-        dict: 字典结构如下:
-        {
-            "顶层属性名":{
-                "属性名":{
-                    "value":"",
-                    "type":""
-                    "offset":0.0,
-                    "zoom":1.0
-                },
-                "timestamp":[]
-            }
-        }
+        TopicStore: 按(名称,实例序号)排序的topic
     """
-    # 获取ulog文件的数据列表
-    data_list = ulog.data_list
-    # 获取所有的属性列表
-    fields = {}
-    for data in data_list:
-        fields[data.name] = {}
-        t_filed = fields[data.name]
+    store = TopicStore()
+    # pyulog的data_list已经按(名称,实例序号)排序
+    for data in ulog.data_list:
+        topic = store.add(Topic(data.name, data.multi_id, data.data["timestamp"]))
         for field in data.field_data:
-            if field.field_name == "timestamp":
-                # 时间需要单独处理
-                t_filed[field.field_name] = data.data[field.field_name]
+            if field.field_name != "timestamp":
+                topic.add_column(
+                    field.field_name, field.type_str, data.data[field.field_name]
+                )
+    return store
+
+
+class _TopicRecorder:
+    """
+    描述:
+        作为pyulog的message_name_filter_list使用,记录日志订阅的所有topic名称
+        和订阅次数(实例数量),只接受accepted中的topic,
+        默认不接受任何topic,因此解析时不会累积任何数据
+    """
+
+    def __init__(self, accepted=()):
+        """
+        参数:
+            accepted (Iterable[str], optional): 需要解码数据的topic名称
+        """
+        # 使用dict保持topic出现的顺序
+        self.names = {}
+        self.accepted = set(accepted)
+
+    def __contains__(self, name: str) -> bool:
+        self.names[name] = self.names.get(name, 0) + 1
+        return name in self.accepted
+
+
+def _flatten_format(message_formats: dict, type_name: str, prefix: str = "") -> list:
+    """
+    描述:
+        按照pyulog的规则展开嵌套的消息格式
+
+    参数:
+        message_formats (dict): ulog.message_formats
+        type_name (str): 消息格式名
+        prefix (str, optional): 属性名前缀
+
+    返回值:
+        list: (属性名,类型)元组列表
+    """
+    fields = []
+    for field_type, array_size, field_name in message_formats[type_name].fields:
+        if field_type in FIELD_TYPES:
+            if array_size > 0:
+                for i in range(array_size):
+                    fields.append((f"{prefix}{field_name}[{i}]", field_type))
             else:
-                t_filed[field.field_name] = {
-                    "type": field.type_str,
-                    "value": data.data[field.field_name],
-                    "offset": 0.0,
-                    "zoom": 1.0,
-                }
+                fields.append((prefix + field_name, field_type))
+        elif array_size > 0:
+            for i in range(array_size):
+                fields += _flatten_format(
+                    message_formats, field_type, f"{prefix}{field_name}[{i}]."
+                )
+        else:
+            fields += _flatten_format(
+                message_formats, field_type, f"{prefix}{field_name}."
+            )
+    if prefix == "":
+        # 去除末尾的padding属性
+        while len(fields) > 0 and fields[-1][0].startswith("_padding"):
+            fields.pop()
     return fields
 
 
+def get_topic_index(ulog: ULog, subscriptions: dict) -> TopicStore:
+    """
+    描述:
+        获取topic索引,结构与get_topic_store相同,但不包含任何数据,
+        timestamp和values均为None,需要时再通过load_ulog_topics加载。
+        同名topic按订阅次数认为实例序号从0开始连续
+
+    参数:
+        ulog (ULog): ulog文件,使用pyulog.ULog创建
+        subscriptions (dict): {topic名称: 订阅次数}
+
+    返回值:
+        TopicStore: topic索引
+    """
+    store = TopicStore()
+    for name in sorted(subscriptions):
+        if name not in ulog.message_formats:
+            continue
+        fields = _flatten_format(ulog.message_formats, name)
+        for multi_id in range(subscriptions[name]):
+            topic = store.add(Topic(name, multi_id))
+            for field_name, field_type in fields:
+                if field_name != "timestamp":
+                    topic.add_column(field_name, field_type)
+    return store
+
+
+def _merge_order(timestamps: list) -> tuple:
+    """
+    描述:
+        计算多段timestamp合并后的顺序
+
+    参数:
+        timestamps (list): 各段的timestamp数组
+
+    返回值:
+        tuple: (segments, destinations)
+            segments为按起始时间排序后的段序号列表;
+            destinations为None时表示各段按segments的顺序首尾相接即为有序,
+            否则为每段中各元素在合并结果中的位置列表(与segments对应)
+    """
+    segments = sorted(range(len(timestamps)), key=lambda i: timestamps[i][0])
+    # 每段内部有序且相邻段的时间范围不重叠时,直接按顺序拼接即可
+    ordered = all(np.all(timestamps[i][1:] >= timestamps[i][:-1]) for i in segments)
+    ordered = ordered and all(
+        timestamps[current][0] >= timestamps[previous][-1]
+        for previous, current in zip(segments, segments[1:])
+    )
+    if ordered:
+        return segments, None
+    # 时间范围重叠或段内无序时,对拼接后的时间做稳定排序(timsort对k段有序数据即为k路归并)
+    order = np.argsort(
+        np.concatenate([timestamps[i] for i in segments]), kind="stable"
+    )
+    positions = np.empty(len(order), dtype=np.int64)
+    positions[order] = np.arange(len(order))
+    bounds = np.cumsum([0] + [len(timestamps[i]) for i in segments])
+    destinations = [positions[bounds[k] : bounds[k + 1]] for k in range(len(segments))]
+    return segments, destinations
+
+
+def _merge_column(columns: list, segments: list, destinations, dtype) -> np.ndarray:
+    """
+    描述:
+        将多段数据合并到一次性分配好的数组中,每段只复制一次
+
+    参数:
+        columns (list): 各段的数据,缺失该属性的段为该段的长度
+        segments (list): _merge_order返回的段顺序
+        destinations (list|None): _merge_order返回的各段在合并结果中的位置
+        dtype (np.dtype): 合并结果的类型
+
+    返回值:
+        np.ndarray: 合并后的数组
+    """
+    lengths = [column if isinstance(column, int) else len(column) for column in columns]
+    merged = np.empty(sum(lengths), dtype=dtype)
+    start = 0
+    for k, i in enumerate(segments):
+        # 缺失该属性的段以NaN填充
+        value = np.nan if isinstance(columns[i], int) else columns[i]
+        if destinations is None:
+            merged[start : start + lengths[i]] = value
+            start += lengths[i]
+        else:
+            merged[destinations[k]] = value
+    return merged
+
+
+def merge_topic_stores(stores: list) -> TopicStore:
+    """
+    描述:
+        合并多个get_topic_store的结果。保留所有文件中出现过的topic实例和属性,
+        每个属性的合并结果只分配一次,合并后每个topic的timestamp单调递增,
+        文件的时间范围重叠或打开顺序与时间顺序不一致时同样适用
+
+    参数:
+        stores (list): TopicStore列表
+
+    返回值:
+        TopicStore: 合并后的topic,某个文件中缺失的属性以NaN填充
+    """
+    if len(stores) == 1:
+        return stores[0]
+    instances = {}
+    empty = {}
+    for store in stores:
+        for key, topic in store.topics.items():
+            parts = instances.setdefault(key, [])
+            if len(topic.timestamp) > 0:
+                parts.append(topic)
+            else:
+                empty.setdefault(key, topic)
+    merged_store = TopicStore()
+    for (name, multi_id), parts in sorted(instances.items()):
+        if len(parts) == 0:
+            # 所有文件中都没有数据的实例保留为空
+            merged_store.add(empty[(name, multi_id)])
+            continue
+        if len(parts) == 1:
+            # 只有一个文件包含该topic时无需复制
+            merged_store.add(parts[0])
+            continue
+        timestamps = [part.timestamp for part in parts]
+        segments, destinations = _merge_order(timestamps)
+        merged = merged_store.add(
+            Topic(
+                name,
+                multi_id,
+                _merge_column(
+                    timestamps, segments, destinations, np.result_type(*timestamps)
+                ),
+            )
+        )
+        # 属性取所有文件的并集,保持首次出现的顺序
+        types = {}
+        for part in parts:
+            for field_name, column in part.columns.items():
+                types.setdefault(field_name, column.type)
+        for field_name, type_str in types.items():
+            columns = [
+                (
+                    part.columns[field_name].values
+                    if field_name in part.columns
+                    else len(part.timestamp)
+                )
+                for part in parts
+            ]
+            dtype = np.result_type(*[c for c in columns if not isinstance(c, int)])
+            if any(isinstance(c, int) for c in columns) and dtype.kind != "f":
+                # 需要用NaN填充缺失的部分
+                dtype = np.result_type(
+                    dtype, np.float32 if dtype.itemsize < 4 else np.float64
+                )
+            if FIELD_TYPES.get(type_str) != dtype:
+                # 类型被提升时(整数以NaN填充或各文件类型不同)使用合并后类型对应的ulog类型
+                type_str = next(
+                    (key for key, value in FIELD_TYPES.items() if value == dtype),
+                    type_str,
+                )
+            merged.add_column(
+                field_name,
+                type_str,
+                _merge_column(columns, segments, destinations, dtype),
+            )
+    return merged_store
+
+
+def merge_topic_indexes(stores: list) -> TopicStore:
+    """
+    描述:
+        合并多个get_topic_index的结果,保留所有文件中出现过的topic实例和属性
+
+    参数:
+        stores (list): topic索引或TopicStore列表
+
+    返回值:
+        TopicStore: 合并后的topic索引
+    """
+    topics = {}
+    for store in stores:
+        for key, topic in store.topics.items():
+            merged = topics.setdefault(key, Topic(*key))
+            for field_name, column in topic.columns.items():
+                # 已经加载了数据的文件(如命中缓存)也只保留索引
+                if field_name not in merged.columns:
+                    merged.add_column(field_name, column.type)
+    return TopicStore(topics[key] for key in sorted(topics))
+
+
 def get_ulog_info(ulog: ULog, verbose=False) -> tuple:
     """
     描述:
@@ -185,3 +432,73 @@ def ulog_timestamp_to_time(timestamp: int, type: int) -> str | float:
         )
     else:
         return timestamp
+
+
+def load_ulog(filepath: str, lazy: bool = False) -> dict:
+    """
+    描述:
+        解析单个ulog文件并提取界面所需的全部数据,供进程池中的子进程调用
+
+    参数:
+        filepath (str): ulog文件路径
+        lazy (bool, optional): 为True时只建立topic和属性的索引,不解码任何数据,
+            此时"info"中的结束时间不包含数据消息的时间戳
+
+    返回值:
+        dict: 可被pickle的字典,结构如下:
+        {
+            "fields": get_topic_store或get_topic_index的结果,
+            "logged_messages": get_logged_message的结果,
+            "initial_parameters": get_initial_parameters的结果,
+            "changed_parameters": get_change_parameters的结果,
+            "info": get_ulog_info的结果
+        }
+    """
+    if lazy:
+        recorder = _TopicRecorder()
+        ulog = ULog(filepath, message_name_filter_list=recorder)
+        fields = get_topic_index(ulog, recorder.names)
+    else:
+        ulog = ULog(filepath)
+        fields = get_topic_store(ulog)
+    return {
+        "fields": fields,
+        "logged_messages": get_logged_message(ulog),
+        "initial_parameters": get_initial_parameters(ulog),
+        "changed_parameters": get_change_parameters(ulog),
+        "info": get_ulog_info(ulog),
+    }
+
+
+def load_ulog_topics(filepath: str, topics: list) -> TopicStore:
+    """
+    描述:
+        只解码指定topic的数据,用于按需加载模式下加载被勾选的属性
+
+    参数:
+        filepath (str): ulog文件路径
+        topics (list): 需要加载的topic名称列表,同名topic的所有实例都会被加载
+
+    返回值:
+        TopicStore: 只包含指定topic的数据,结构同get_topic_store,
+        与get_topic_index相同包含每个订阅的实例
+    """
+    recorder = _TopicRecorder(topics)
+    ulog = ULog(filepath, message_name_filter_list=recorder)
+    store = get_topic_store(ulog)
+    # pyulog的data_list中没有只有订阅而没有任何数据的实例,按空数组补齐,
+    # 否则这些实例在索引中一直保持未加载的状态
+    added = False
+    for name in recorder.accepted & recorder.names.keys():
+        if name not in ulog.message_formats:
+            continue
+        for multi_id in range(recorder.names[name]):
+            if store.get(name, multi_id) is not None:
+                continue
+            topic = store.add(Topic(name, multi_id, np.empty(0, dtype=np.uint64)))
+            for field_name, field_type in _flatten_format(ulog.message_formats, name):
+                if field_name != "timestamp":
+                    values = np.empty(0, dtype=FIELD_TYPES[field_type])
+                    topic.add_column(field_name, field_type, values)
+            added = True
+    return store.sorted() if added else store
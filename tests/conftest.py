@@ -0,0 +1,4 @@
+import os, sys
+
+# 与main.py相同,从仓库根目录导入src
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+from src.utils.align_utils import (
+    align_column,
+    align_fields,
+    make_time_grid,
+    reference_time_grid,
+)
+from src.utils.topic_utils import Topic, TopicStore
+
+nan = np.nan
+TIMES = np.array([100, 200, 300], dtype=np.uint64)
+VALUES = np.array([1, 5, 3], dtype=np.int16)
+
+
+@pytest.mark.parametrize(
+    "method, expected",
+    [
+        # 网格在首点之前、与点重合、两点之间(正中间时取之前的点)、与末点重合、在末点之后
+        ("nearest", [1, 1, 1, 1, 1, 5, 5, 3, 3]),
+        ("previous", [nan, nan, 1, 1, 1, 5, 5, 3, 3]),
+        ("linear", [nan, nan, 1, 2, 3, 5, 4, 3, nan]),
+    ],
+)
+def test_align_column(method, expected):
+    grid = np.array([0, 99, 100, 125, 150, 200, 250, 300, 400], dtype=np.uint64)
+    result = align_column(TIMES, VALUES, grid, method)
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize("method", ["nearest", "previous", "linear"])
+def test_align_column_on_samples_keeps_values(method):
+    result = align_column(TIMES, VALUES, TIMES, method)
+    np.testing.assert_array_equal(result, VALUES)
+    if method != "linear":
+        # 没有缺失时保持原始类型
+        assert result.dtype == VALUES.dtype
+
+
+def test_align_column_nearest_tie_uses_previous():
+    result = align_column(TIMES, VALUES, np.array([150, 250]), "nearest")
+    np.testing.assert_array_equal(result, [1, 5])
+
+
+@pytest.mark.parametrize(
+    "method, expected",
+    [
+        # 相同时间戳使用其中最后一个点
+        ("nearest", [1, 3, 3, 4, 4]),
+        ("previous", [1, 3, 3, 3, 4]),
+        ("linear", [1, 3, 3.2, 3.6, 4]),
+    ],
+)
+def test_align_column_duplicate_timestamps(method, expected):
+    times = np.array([0, 10, 10, 10, 20], dtype=np.uint64)
+    values = np.array([1.0, 2.0, 9.0, 3.0, 4.0])
+    grid = np.array([0, 10, 12, 16, 20], dtype=np.uint64)
+    np.testing.assert_allclose(align_column(times, values, grid, method), expected)
+
+
+@pytest.mark.parametrize("method", ["nearest", "previous", "linear"])
+def test_align_column_float_grid(method):
+    # 浮点网格与整数时间戳,包括负数和小数
+    grid = np.array([-5.0, 100.0, 100.5, 299.5, 300.0])
+    expected = align_column(TIMES.astype(np.float64), VALUES, grid, method)
+    np.testing.assert_array_equal(align_column(TIMES, VALUES, grid, method), expected)
+
+
+@pytest.mark.parametrize("method", ["nearest", "previous", "linear"])
+def test_align_column_empty(method):
+    times = np.empty(0, dtype=np.uint64)
+    result = align_column(times, np.empty(0), np.array([1, 2]), method)
+    np.testing.assert_array_equal(result, [nan, nan])
+
+
+def test_align_column_unknown_method():
+    with pytest.raises(ValueError):
+        align_column(TIMES, VALUES, TIMES, "cubic")
+
+
+@pytest.mark.parametrize(
+    "method, types",
+    [
+        ("nearest", ["int16_t", "float"]),
+        ("previous", ["int16_t", "double"]),
+        ("linear", ["double", "double"]),
+    ],
+)
+def test_align_fields(method, types):
+    a = Topic("a", 0, TIMES)
+    a.add_column("x", "int16_t", VALUES)
+    b = Topic("b", 1, np.array([150, 250], dtype=np.uint64))
+    b.add_column("y", "float", np.array([10, 20], dtype=np.float32))
+    grid = np.array([100, 150, 200, 250, 300], dtype=np.uint64)
+    aligned = align_fields(TopicStore([a, b]), grid, method)
+    assert aligned.timestamp is grid
+    assert list(aligned.columns) == ["a.x", "b_1.y"]
+    assert [column.type for column in aligned.columns.values()] == types
+    for column in aligned.columns.values():
+        assert len(column.values) == len(grid)
+    np.testing.assert_array_equal(
+        aligned.columns["a.x"].values, align_column(TIMES, VALUES, grid, method)
+    )
+
+
+def test_make_time_grid():
+    grid = make_time_grid(0, 1e6, 4)
+    np.testing.assert_array_equal(grid, [0, 250000, 500000, 750000, 1000000])
+    assert len(make_time_grid(10, 5, 100)) == 0
+
+
+def test_reference_time_grid():
+    times = np.arange(0, 100, 10, dtype=np.uint64)
+    np.testing.assert_array_equal(reference_time_grid(times, 15, 40), [20, 30, 40])
+    np.testing.assert_array_equal(reference_time_grid(times), times)
+    assert len(reference_time_grid(times, 50, 20)) == 0
@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+from src.utils.common_utils import (
+    adaptivePointNums,
+    getSamplingMethod,
+    lttbDownsampled,
+    averageDownsampled,
+    minDownsampled,
+    maxDownsampled,
+    m4Downsampled,
+    noneDownsampled,
+)
+
+
+# 向量化之前的逐点实现,作为结果一致性的参考
+def referenceLttb(data: np.ndarray, nout: int) -> np.ndarray:
+    if len(data) <= nout or len(data) < 3:
+        return data
+    n = len(data)
+    sampled = [data[0]]
+    bucket_size = (n - 2) // (nout - 2)
+    leftover = (n - 2) % (nout - 2)
+    current_bucket_start = 1
+    for i in range(1, nout - 1):
+        bucket_end = current_bucket_start + bucket_size - 1
+        if i <= leftover:
+            bucket_end += 1
+        bucket_end = min(bucket_end, n - 2)
+        max_area = -1
+        max_area_index = current_bucket_start
+        for j in range(current_bucket_start, bucket_end + 1):
+            x1, y1 = sampled[i - 1]
+            x2, y2 = data[j]
+            x3, y3 = data[bucket_end + 1]
+            area = abs(x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2)) * 0.5
+            if area > max_area:
+                max_area = area
+                max_area_index = j
+        sampled.append(data[max_area_index])
+        current_bucket_start = bucket_end + 1
+    sampled.append(data[-1])
+    return np.array(sampled)
+
+
+def referenceAverage(data: np.ndarray, nout: int) -> np.ndarray:
+    if len(data) <= nout:
+        return data
+    return np.array([np.mean(group, axis=0) for group in np.array_split(data, nout)])
+
+
+def referenceMin(data: np.ndarray, nout: int) -> np.ndarray:
+    if len(data) <= nout:
+        return data
+    groups = np.array_split(data, nout)
+    return np.array([group[np.argmin(group[:, 1])] for group in groups])
+
+
+def referenceMax(data: np.ndarray, nout: int) -> np.ndarray:
+    if len(data) <= nout:
+        return data
+    groups = np.array_split(data, nout)
+    return np.array([group[np.argmax(group[:, 1])] for group in groups])
+
+
+def referenceM4(data: np.ndarray, nout: int) -> np.ndarray:
+    if len(data) <= nout:
+        return data
+    sampled = []
+    for group in np.array_split(data, max(nout // 4, 1)):
+        indices = {
+            0,
+            int(np.argmin(group[:, 1])),
+            int(np.argmax(group[:, 1])),
+            len(group) - 1,
+        }
+        sampled += [group[i] for i in sorted(indices)]
+    return np.array(sampled)
+
+
+METHODS = [
+    ("lttb", lttbDownsampled, referenceLttb),
+    ("average", averageDownsampled, referenceAverage),
+    ("min", minDownsampled, referenceMin),
+    ("max", maxDownsampled, referenceMax),
+    ("m4", m4Downsampled, referenceM4),
+    ("none", noneDownsampled, lambda data, nout: data),
+]
+
+
+def makeData(kind: str, n: int) -> np.ndarray:
+    rng = np.random.default_rng(n)
+    x = 1.7e12 + np.cumsum(rng.integers(1, 5000, n)).astype(np.float64)
+    if kind == "random":
+        y = rng.standard_normal(n) * 1e3
+    elif kind == "nan":
+        y = rng.standard_normal(n)
+        # 开头、中间和末尾的连续NaN,以及零散的NaN
+        y[: n // 10] = np.nan
+        y[n // 3 : n // 2] = np.nan
+        y[-n // 20 :] = np.nan
+        y[::17] = np.nan
+    elif kind == "ties":
+        # 少量取值,大量相同的最值和相同的三角形面积
+        y = rng.integers(-2, 3, n).astype(np.float64)
+    else:
+        # 常量数据,所有面积都相等
+        y = np.full(n, 3.0)
+    return np.stack((x, y), axis=1)
+
+
+@pytest.mark.parametrize("name, method, reference", METHODS)
+@pytest.mark.parametrize("kind", ["random", "nan", "ties", "constant"])
+@pytest.mark.parametrize("n, nout", [(10007, 1000), (5000, 37), (1000, 3), (64, 7)])
+def test_matches_reference(name, method, reference, kind, n, nout):
+    data = makeData(kind, n)
+    assert getSamplingMethod(name) is method
+    np.testing.assert_array_equal(method(data, nout), reference(data, nout))
+
+
+@pytest.mark.parametrize("name, method, reference", METHODS)
+@pytest.mark.parametrize("n, nout", [(100, 100), (100, 1000), (2, 3), (0, 10)])
+def test_no_downsampling_when_nout_not_smaller(name, method, reference, n, nout):
+    data = makeData("random", n)
+    np.testing.assert_array_equal(method(data, nout), data)
+    np.testing.assert_array_equal(method(data, nout), reference(data, nout))
+
+
+@pytest.mark.parametrize("name, method, reference", METHODS[1:])
+@pytest.mark.parametrize("nout", [1, 2])
+def test_tiny_nout(name, method, reference, nout):
+    data = makeData("nan", 503)
+    np.testing.assert_array_equal(method(data, nout), reference(data, nout))
+
+
+@pytest.mark.parametrize("nout", [1, 2])
+def test_lttb_tiny_nout_keeps_endpoints(nout):
+    # 逐点实现在nout<3时除以零,向量化实现只保留首尾两个点
+    data = makeData("random", 503)
+    np.testing.assert_array_equal(lttbDownsampled(data, nout), data[[0, -1]])
+
+
+@pytest.mark.parametrize("chartType", ["line", "scatter"])
+@pytest.mark.parametrize("plotWidth", [0, 10, 800, 3840])
+@pytest.mark.parametrize("seriesCount", [1, 5, 40, 500])
+@pytest.mark.parametrize("pointBudget", [1000, 20000, 200000])
+def test_adaptive_point_nums_within_budget(
+    chartType, plotWidth, seriesCount, pointBudget
+):
+    inside, part, outside = adaptivePointNums(
+        plotWidth, seriesCount, chartType, pointBudget
+    )
+    if pointBudget / seriesCount >= 32:
+        # 每个series为可视区、两侧部分可视区和两侧完全不可视区
+        assert (inside + 2 * part + 2 * outside) * seriesCount <= pointBudget
+    assert min(inside, part, outside) >= 2
+    if pointBudget / (1.6 * seriesCount) >= 100:
+        assert inside >= 100
+
+
+def test_adaptive_point_nums_tiny_budget_keeps_endpoints():
+    assert adaptivePointNums(800, 100, "line", 100) == (2, 2, 2)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from src.utils.lod_utils import LodPyramid
+
+
+def makePyramid(n: int, seed: int = 0) -> LodPyramid:
+    rng = np.random.default_rng(seed)
+    values = rng.random(n)
+    values[rng.integers(0, n, n // 20)] = np.nan
+    return LodPyramid(np.arange(n, dtype=np.uint64), values)
+
+
+def test_query_edge_groups_outside_range():
+    # nout很小时两端组的极值可能全部在范围外
+    lod = LodPyramid(np.arange(5000), np.random.default_rng(0).random(5000))
+    indices = lod.query(1696, 2477, 0)
+    assert np.all((indices >= 1696) & (indices < 2477))
+
+
+@pytest.mark.parametrize("nout", [0, 1, 4, 7, 100])
+def test_query_random_ranges(nout):
+    lod = makePyramid(5000)
+    rng = np.random.default_rng(nout)
+    for _ in range(2000):
+        start, end = sorted(rng.integers(0, 5001, 2))
+        indices = lod.query(start, end, nout)
+        assert np.all((indices >= start) & (indices < end))
+        assert np.all(np.diff(indices) > 0)
+
+
+def test_query_small_range_returns_all_points():
+    lod = makePyramid(1000)
+    np.testing.assert_array_equal(lod.query(10, 20, 100), np.arange(10, 20))
+
+
+def test_valueRange_matches_nanmin_nanmax():
+    lod = makePyramid(30001, seed=1)
+    rng = np.random.default_rng(2)
+    for _ in range(500):
+        start, end = sorted(rng.integers(0, 30002, 2))
+        segment = lod.values[start:end]
+        expected = (
+            None
+            if np.isnan(segment).all()
+            else (np.nanmin(segment), np.nanmax(segment))
+        )
+        assert lod.valueRange(start, end, int(rng.integers(1, 2000))) == expected
@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+from src.utils.topic_utils import Topic, TopicStore
+from src.utils.ulog_utils import _merge_order, merge_topic_stores
+
+
+def makeTopic(name: str, timestamp, multi_id: int = 0, **columns) -> Topic:
+    topic = Topic(name, multi_id, np.asarray(timestamp, dtype=np.uint64))
+    for field_name, (type_str, values) in columns.items():
+        topic.add_column(field_name, type_str, np.asarray(values))
+    return topic
+
+
+def makeStore(*topics) -> TopicStore:
+    return TopicStore(topics)
+
+
+def test_merge_order_disjoint_out_of_order():
+    timestamps = [np.array([20, 21, 22]), np.array([0, 1, 2]), np.array([10, 11])]
+    segments, destinations = _merge_order(timestamps)
+    assert segments == [1, 2, 0]
+    assert destinations is None
+
+
+@pytest.mark.parametrize(
+    "timestamps",
+    [
+        [np.array([0, 2, 4, 6]), np.array([1, 3, 5])],
+        [np.array([5, 6, 7]), np.array([0, 5, 9])],
+        [np.array([0, 3, 1]), np.array([2])],
+    ],
+)
+def test_merge_order_overlapping(timestamps):
+    segments, destinations = _merge_order(timestamps)
+    assert destinations is not None
+    merged = np.empty(sum(map(len, timestamps)), dtype=np.int64)
+    for k, i in enumerate(segments):
+        merged[destinations[k]] = timestamps[i]
+    np.testing.assert_array_equal(merged, np.sort(np.concatenate(timestamps)))
+
+
+def test_merge_order_keeps_equal_timestamps_stable():
+    # 相同的时间戳保持按起始时间排序后的段顺序
+    timestamps = [np.array([3, 5]), np.array([1, 3, 5])]
+    segments, destinations = _merge_order(timestamps)
+    assert segments == [1, 0]
+    np.testing.assert_array_equal(destinations[0], [0, 1, 3])
+    np.testing.assert_array_equal(destinations[1], [2, 4])
+
+
+def test_merge_out_of_order_files():
+    merged = merge_topic_stores(
+        [
+            makeStore(makeTopic("a", [10, 11, 12], x=("float", np.float32([4, 5, 6])))),
+            makeStore(makeTopic("a", [0, 1, 2], x=("float", np.float32([1, 2, 3])))),
+        ]
+    )
+    np.testing.assert_array_equal(merged["a"].timestamp, [0, 1, 2, 10, 11, 12])
+    np.testing.assert_array_equal(merged["a"].columns["x"].values, [1, 2, 3, 4, 5, 6])
+    assert merged["a"].columns["x"].values.dtype == np.float32
+
+
+def test_merge_overlapping_files():
+    merged = merge_topic_stores(
+        [
+            makeStore(makeTopic("a", [0, 2, 4], x=("int32_t", np.int32([0, 2, 4])))),
+            makeStore(makeTopic("a", [1, 3, 5], x=("int32_t", np.int32([1, 3, 5])))),
+        ]
+    )
+    topic = merged["a"]
+    np.testing.assert_array_equal(topic.timestamp, np.arange(6))
+    np.testing.assert_array_equal(topic.columns["x"].values, np.arange(6))
+    # 所有文件都有该属性时不需要提升类型
+    assert topic.columns["x"].values.dtype == np.int32
+    assert topic.columns["x"].type == "int32_t"
+
+
+def test_merge_union_of_disjoint_topics():
+    merged = merge_topic_stores(
+        [
+            makeStore(makeTopic("b", [0, 1], y=("double", [1.0, 2.0]))),
+            makeStore(
+                makeTopic("a", [5, 6], x=("float", np.float32([3, 4]))),
+                makeTopic("a", [7], multi_id=1, x=("float", np.float32([5]))),
+            ),
+        ]
+    )
+    assert list(merged) == ["a", "a_1", "b"]
+    np.testing.assert_array_equal(merged["b"].columns["y"].values, [1.0, 2.0])
+    np.testing.assert_array_equal(merged["a_1"].timestamp, [7])
+
+
+def test_merge_keeps_topics_empty_in_all_files():
+    empty = makeTopic("a", [], x=("float", np.empty(0, dtype=np.float32)))
+    merged = merge_topic_stores([makeStore(empty), makeStore(empty)])
+    assert len(merged["a"].timestamp) == 0
+    assert list(merged["a"].columns) == ["x"]
+
+
+@pytest.mark.parametrize(
+    "type_str, dtype, merged_type, merged_dtype",
+    [
+        ("float", np.float32, "float", np.float32),
+        ("double", np.float64, "double", np.float64),
+        ("uint8_t", np.uint8, "float", np.float32),
+        ("int16_t", np.int16, "float", np.float32),
+        ("int32_t", np.int32, "double", np.float64),
+        ("uint64_t", np.uint64, "double", np.float64),
+        ("bool", np.int8, "float", np.float32),
+    ],
+)
+def test_merge_field_missing_from_one_file(type_str, dtype, merged_type, merged_dtype):
+    merged = merge_topic_stores(
+        [
+            makeStore(makeTopic("a", [0, 1], x=(type_str, np.array([1, 2], dtype)))),
+            makeStore(makeTopic("a", [2, 3, 4], y=("float", np.float32([7, 8, 9])))),
+        ]
+    )
+    topic = merged["a"]
+    assert list(topic.columns) == ["x", "y"]
+    x, y = topic.columns["x"], topic.columns["y"]
+    # 缺失的部分以NaN填充,整数属性提升为浮点数且类型名与合并后的类型一致
+    np.testing.assert_array_equal(x.values, [1, 2, np.nan, np.nan, np.nan])
+    np.testing.assert_array_equal(y.values, [np.nan, np.nan, 7, 8, 9])
+    assert x.values.dtype == merged_dtype
+    assert x.type == merged_type
+    assert y.type == "float"
+
+
+def test_merge_different_types_across_files():
+    merged = merge_topic_stores(
+        [
+            makeStore(makeTopic("a", [0], x=("int8_t", np.int8([1])))),
+            makeStore(makeTopic("a", [1], x=("int16_t", np.int16([2])))),
+        ]
+    )
+    column = merged["a"].columns["x"]
+    assert column.values.dtype == np.int16
+    assert column.type == "int16_t"